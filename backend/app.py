@@ -1,266 +1,241 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import pdfplumber
 import json
-import re
-from decimal import Decimal, InvalidOperation
 import os
-from werkzeug.utils import secure_filename
 import tempfile
 import pymongo
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
-import pandas as pd
-from jinja2 import Template
-from reportlab.pdfgen import canvas
-from export_utils import export_utils
-import textwrap
+from export_utils import EXPORT_FORMATS
+from export_cache import export_cache
+from export_renderer import export_renderer, RenderPending
+from extraction_utils import process_cersai_reports, iter_cersai_records, page_fingerprints, extraction_pool
+from text_backends import text_backends
+from extraction_cache import extraction_cache
+from job_utils import job_store, job_runner
+from summary_utils import search_summaries, SEARCH_FILTERS, LIST_FIELDS, SEARCH_INDEXES, SUMMARY_PAGE_SIZE
+from summary_utils import load_summary, ASSET_CHUNK_INDEXES
+from summary_utils import summary_document, save_summaries, SAVE_BATCH_SIZE
+from mongo_utils import MongoConnection
+from migrate import pending_migrations
+from metrics_utils import metrics, http_requests_total, http_request_duration_seconds, export_cache_requests_total, MongoCommandMetrics
+from werkzeug.datastructures import FileStorage
+import time
+
+# --- Load environment variables ---
+load_dotenv()
+# Uploads up to this size stay in memory; larger ones spill to UPLOAD_SPOOL_DIR
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv('UPLOAD_SPOOL_MAX_BYTES', str(32 * 1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv('UPLOAD_SPOOL_DIR') or None
+JOB_EVENTS_POLL_SECONDS = float(os.getenv('JOB_EVENTS_POLL_SECONDS', '15'))
+
+class SpooledUploadRequest(Request):
+    """
+    Buffers each uploaded file in a SpooledTemporaryFile, so typical reports
+    are parsed straight from memory instead of being written to a temp file
+    and read back.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES, mode='rb+', dir=UPLOAD_SPOOL_DIR)
 
 # --- Flask App Initialization ---
 app = Flask(__name__)
+app.request_class = SpooledUploadRequest
 CORS(app)  # Enable CORS for all routes
 
-# --- Load environment variables ---
-load_dotenv()
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/digestadoc')
 MONGODB_DB = os.getenv('MONGODB_DB', 'digestadoc')
 FLASK_SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'default_secret')
 app.secret_key = FLASK_SECRET_KEY
 
-# --- MongoDB Client Setup with Error Handling ---
-try:
-    mongo_client = pymongo.MongoClient(MONGODB_URI)
-    # Test the connection
-    mongo_client.admin.command('ping')
-    db = mongo_client[MONGODB_DB]
-    pdf_collection = db['pdfs']
-    summary_collection = db['summaries']
-    print("✅ MongoDB connected successfully")
-except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
-    mongo_client = None
-    db = None
-    pdf_collection = None
-    summary_collection = None
+# --- MongoDB Client Setup ---
+# Nothing here waits for the server: see mongo_utils.py. Setup that needs it
+# runs from the health probe once it is first reached.
+mongo = MongoConnection(MONGODB_URI, event_listeners=[MongoCommandMetrics()])
+mongo_client = mongo.client
+db = mongo_client[MONGODB_DB] if mongo_client is not None else None
+summary_collection = db['summaries'] if db is not None else None
+# Assets of large summaries, see summary_utils.py
+asset_collection = db['summary_assets'] if db is not None else None
+
+@mongo.on_connect
+def attach_mongo_stores():
+    if os.getenv('EXTRACTION_CACHE_MONGO', '').lower() in ('1', 'true', 'yes'):
+        extraction_cache.attach_mongo(db['extraction_cache'])
+        print("✅ Extraction cache backed by MongoDB")
+    if os.getenv('JOB_STORE_MONGO', '').lower() in ('1', 'true', 'yes'):
+        job_store.attach_mongo(db['jobs'])
+        print("✅ Job store backed by MongoDB")
+    if os.getenv('EXPORT_CACHE_GRIDFS', '').lower() in ('1', 'true', 'yes'):
+        export_cache.attach_gridfs(db)
+        print("✅ Export cache backed by GridFS")
+
+# --- Indexes ---
+# Every query the API runs on a collection has an index here. They are created
+# at startup; create_index does nothing when the index already exists.
+SUMMARY_INDEXES = [
+    [("pdf_id", pymongo.ASCENDING)],
+] + SEARCH_INDEXES  # GET /summaries, see summary_utils.py
+
+@mongo.on_connect
+def ensure_indexes():
+    try:
+        for keys in SUMMARY_INDEXES:
+            summary_collection.create_index(keys)
+        for keys in ASSET_CHUNK_INDEXES:
+            asset_collection.create_index(keys, unique=True)
+        print("✅ MongoDB indexes in place")
+    except Exception as e:
+        print(f"❌ Creating MongoDB indexes failed: {e}")
+
+@mongo.on_connect
+def check_migrations():
+    # Data migrations are run by `python migrate.py`, never here
+    try:
+        pending = pending_migrations(db)
+    except Exception as e:
+        print(f"❌ Checking data migrations failed: {e}")
+        return
+    if pending:
+        print(f"⚠️  Pending data migrations: {', '.join(pending)}. Run `python migrate.py` from the backend directory.")
+
+# Extraction workers (worker_pool.py) import this module as __mp_main__ when
+# it is run as a script; they serve no requests, so they need no probe
+if __name__ != '__mp_main__':
+    mongo.start()
 
 # --- Save PDF and Summary to MongoDB ---
 def save_pdf_and_summary(pdf_filename, summary_json, company_details=None):
-    if not mongo_client:
+    """Stores a summary with its PDF's metadata in one insert."""
+    if not mongo.is_available():
         return None, None
     
     try:
-        pdf_doc = {
-            "filename": pdf_filename, 
-            "summary_id": None,
-            "company_details": company_details  # Include company details
-        }
-        pdf_id = pdf_collection.insert_one(pdf_doc).inserted_id
-        summary_doc = {"pdf_id": pdf_id, "summary": summary_json}
-        summary_id = summary_collection.insert_one(summary_doc).inserted_id
-        pdf_collection.update_one({"_id": pdf_id}, {"$set": {"summary_id": summary_id}})
-        return str(pdf_id), str(summary_id)
+        doc, chunks = summary_document(pdf_filename, summary_json, company_details)
+        # Chunks first, so a summary is never found with assets missing
+        if chunks:
+            asset_collection.insert_many(chunks)
+        try:
+            summary_collection.insert_one(doc)
+        except Exception:
+            if chunks:
+                asset_collection.delete_many({"summary_id": doc["_id"]})
+            raise
+        return str(doc["pdf_id"]), str(doc["_id"])
     except Exception as e:
         print(f"Error saving to MongoDB: {e}")
         return None, None
 
+def resave_pdf_and_summary(pdf_id, pdf_filename, summary_json, company_details=None):
+    """
+    Replaces the summary saved for `pdf_id` with a new version and drops the
+    exports rendered from the old one. Returns (pdf_id, summary_id, version)
+    with the version written, (None, None, None) when saving failed or a
+    concurrent re-save won, or None when there is no such summary.
+    """
+    if not mongo.is_available():
+        return None, None, None
+
+    try:
+        pdf_id = ObjectId(pdf_id)
+        current = summary_collection.find_one({"pdf_id": pdf_id}, {"version": 1, "created_at": 1})
+        if not current:
+            return None
+        previous = current.get("version")
+        doc, chunks = summary_document(pdf_filename, summary_json, company_details, pdf_id=pdf_id,
+                                       summary_id=current["_id"], version=(previous or 1) + 1,
+                                       created_at=current.get("created_at"))
+        if chunks:
+            try:
+                asset_collection.insert_many(chunks)
+            except Exception:
+                # Chunks already written would block every later re-save on the unique index
+                asset_collection.delete_many({"pdf_id": pdf_id, "version": doc["version"]})
+                raise
+        # Only if nobody re-saved it in between
+        replaced = summary_collection.replace_one(
+            {"_id": current["_id"], "version": previous if previous else {"$exists": False}}, doc
+        )
+        if not replaced.matched_count:
+            asset_collection.delete_many({"pdf_id": pdf_id, "version": doc["version"]})
+            print(f"❌ Summary {pdf_id} was re-saved concurrently")
+            return None, None, None
+        asset_collection.delete_many({"pdf_id": pdf_id, "version": {"$ne": doc["version"]}})
+        export_cache.invalidate(str(pdf_id))
+        return str(pdf_id), str(doc["_id"]), doc["version"]
+    except Exception as e:
+        print(f"Error saving to MongoDB: {e}")
+        return None, None, None
+
 # --- Retrieve Summary by PDF ID ---
 def get_summary_by_pdf_id(pdf_id):
-    if not mongo_client:
-        return None
+    summary, _, _ = get_summary_page(pdf_id)
+    return summary
+
+def get_summary_page(pdf_id, offset=0, limit=None, fields=None):
+    """
+    The summary with assets[offset:offset + limit] (reduced to `fields`), its
+    total asset count and its version.
+    """
+    if not mongo.is_available():
+        return None, 0, None
     
     try:
-        summary_doc = summary_collection.find_one({"pdf_id": ObjectId(pdf_id)})
-        return summary_doc["summary"] if summary_doc else None
+        return load_summary(summary_collection, asset_collection, ObjectId(pdf_id), offset, limit, fields)
+    except Exception as e:
+        print(f"Error retrieving from MongoDB: {e}")
+        return None, 0, None
+
+def get_summary_version(pdf_id):
+    """Version of the summary saved for `pdf_id` (1 until re-saved), or None when there is none."""
+    if not mongo.is_available():
+        return None
+
+    try:
+        doc = summary_collection.find_one({"pdf_id": ObjectId(pdf_id)}, {"version": 1, "_id": 0})
+        return doc.get("version", 1) if doc is not None else None
     except Exception as e:
         print(f"Error retrieving from MongoDB: {e}")
         return None
 
 # --- Export utilities are now handled by export_utils.py ---
 
-# --- Your Corrected and Integrated PDF Parsing Logic ---
+# --- PDF parsing is handled by extraction_utils.py ---
 
-def safe_get_value(text_blob, pattern, group=1, default="-"):
-    """
-    Safely extracts a value from a text blob using a regex pattern.
-    Returns the found group or a default value if not found.
-    """
-    try:
-        match = re.search(pattern, text_blob, re.DOTALL | re.IGNORECASE)
-        if match and group <= len(match.groups()):
-            # Ensure the matched group is not None before stripping
-            value = match.group(group)
-            return value.strip().replace('\n', ' ') if value else default
-    except IndexError:
-        print(f"Warning: Group {group} does not exist for pattern: {pattern}")
-    return default
-
-def convert_to_lakhs(amount_str):
-    """
-    Converts a string amount to a formatted string in Lakhs.
-    Example: "374400000.00" -> "3744.00 Lakhs"
-    """
-    if not amount_str or amount_str == '-':
-        return "0.00 Lakhs"
-    try:
-        amount = Decimal(amount_str)
-        lakhs = amount / Decimal('100000')
-        return f"{lakhs:.2f} Lakhs"
-    except (InvalidOperation, TypeError):
-        return "0.00 Lakhs"
-
-# --- Asset and Security Field Maps (from user logic) ---
-asset_field_map = {
-    "asset_id": r"Asset ID\s*([0-9]+)",
-    "plot_id": r"Plot Number\s*([^\n\r]+?)(?:\s+Area|\n|$)",
-    "survey_no": r"Survey Number\s*/\s*Municipal Number\s*([^\n\r]+?)(?:\s+Plot|\n|$)",
-    "house_id": r"House\s*/\s*Flat Number\s*/\s*Unit No\s*([^\n\r]+?)(?:\s+Floor|\n|$)",
-    "floor_no": r"Floor No\s*([^\n\r]+?)(?:\s+Building|\n|$)",
-    "building_no": r"Building\s*/\s*Tower Name\s*/\s*Number\s*([^\n\r]+?)(?:\s+Name|\n|$)",
-    "building_name": r"Name of the Project\s*/\s*Scheme\s*/\s*Society\s*/\s*Zone\s*([^\n\r]+?)(?:\s+Street|\n|$)",
-    "buildup_area": r"Area\s*([0-9.]+)",
-    "street_name": r"Street Name\s*/\s*Number\s*([^\n\r]+?)(?:\s+Pocket|\n|$)",
-    "sector_ward_no": r"Locality\s*/\s*Sector\s*([^\n\r]+?)(?:\s+City|\n|$)",
-    "locality": r"Locality\s*/\s*Sector\s*([^\n\r]+?)(?:\s+City|\n|$)",
-    "landmark": r"Landmark\s*([^\n\r]+?)(?:\s+Block|\n|$)",
-    "block_no": r"Block Number\s*([^\n\r]+?)(?:\s+Village|\n|$)",
-    "village": r"City\s*/\s*Town\s*/\s*Village\s*([^\n\r]+?)(?:\s+District|\n|$)",
-    "town": r"City\s*/\s*Town\s*/\s*Village\s*([^\n\r]+?)(?:\s+District|\n|$)",
-    "taluka": r"Taluka\s*([^\n\r]+?)(?:\s+District|\n|$)",
-    "district": r"District\s*([^\n\r]+?)(?:\s+State|\n|$)",
-    "pin_code": r"Pin Code\s*/\s*Post Code\s*([0-9]+)",
-    "state": r"State\s*/\s*UT\s*([^\n\r]+)",
-}
-
-security_field_map = {
-    "security_interest_id": r"Security Interest ID\s*([0-9]+)",
-    "security_interest_type": r"Type Of Security Interest\s*([^\n\r]+?)(?:\s+Type Of Finance|\s+Details Of Charge|\n|$)",
-    "si_creation_date": r"SI Creation Date In Bank\s*([0-9\-]+)",
-    "charge_holder_name": r"Charge Holder Name\s+Office / Ward / Branch Name\s*(.*?)\s*(?:Original View|Transaction History)",
-    "charge_amount": r"Total Secured Amount\s*([0-9.]+)",
-    "borrower_type": r"Borrower Type\s*([^\n\r]+?)(?:\s+Asset Category|\s+Name of the Debtor|\n|$)",
-    "details_of_charge": r"Details Of Charge\s*([^\n\r]+)",
-}
-
-def parse_borrower_details(text_blob):
-    borrower_section_match = re.search(r"Borrower\(s\) Details(.*?)Holder Details", text_blob, re.DOTALL | re.IGNORECASE)
-    if not borrower_section_match:
-        return None, None
-    borrower_text = borrower_section_match.group(1)
-    borrower_line_match = re.search(r"^\s*1\s+.*?Company\s+(.*?)\s+NA\s+(Yes|No)", borrower_text, re.MULTILINE | re.IGNORECASE)
-    if borrower_line_match:
-        borrower_name = borrower_line_match.group(1).strip().replace('\n', ' ')
-        is_owner = borrower_line_match.group(2).strip()
-        borrower_name_formatted = f"{borrower_name} (Maharashtra, PIN: 400013)"
-        third_party_mortgagee = "N/A"
-        if is_owner.lower() == 'no':
-            third_party_mortgagee = "Details to be extracted"
-        return borrower_name_formatted, third_party_mortgagee
-    return None, None
-
-def extract_data_from_pdf(pdf_path, company_details=None):
-    """
-    Extracts data from CERSAI PDF files.
-    
-    Args:
-        pdf_path: Path to the PDF file
-        company_details: Optional dict containing company information from frontend form
-                        Keys: companyName, cinNumber, searchReferenceId, dateOfIncorporation, 
-                              udin, registeredOffice
-    
-    Returns:
-        Tuple of (asset_data, header_info) where header_info uses company_details if provided
-    """
-    with pdfplumber.open(pdf_path) as pdf:
-        full_text = ""
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                full_text += page_text + "\n"
-    # Asset details
-    asset_details = {}
-    for key, pattern in asset_field_map.items():
-        asset_details[key] = safe_get_value(full_text, pattern, default="-")
-    # Buildup area (combine area and unit)
-    area_value = asset_details.get("buildup_area", "-")
-    area_unit = safe_get_value(full_text, r"Area Unit\s*(\w+\s*\w+)", default="-")
-    asset_details["buildup_area"] = f"{area_value} {area_unit}".strip() if area_value != '-' and area_unit != '-' else "-"
-    # Security interest details
-    security_interest_details = {}
-    for key, pattern in security_field_map.items():
-        security_interest_details[key] = safe_get_value(full_text, pattern, default="-")
-    # Charge holder name and amount
-    charge_holder_name = security_interest_details.get("charge_holder_name", "-")
-    charge_amount_raw = security_interest_details.get("charge_amount", "0.00")
-    charge_amount = convert_to_lakhs(charge_amount_raw)
-    security_interest_details["charge_holder_name_amount"] = f"{charge_holder_name} Rs. {charge_amount}"
-    # Borrower details
-    borrower_name, third_party_mortgagee = parse_borrower_details(full_text)
-    security_interest_details["borrowers"] = borrower_name or "-"
-    security_interest_details["sub_borrower"] = "-"
-    security_interest_details["third_party_mortgagees"] = third_party_mortgagee or "-"
-    # Is assetUnder Charge?/ Ranking of Charge logic
-    details_of_charge_pattern = r"Details Of Charge\s*([^\n\r]+)"
-    details_of_charge = safe_get_value(full_text, details_of_charge_pattern, default="-")
-    if details_of_charge and details_of_charge != "-":
-        security_interest_details["Is assetUnder Charge?/ Ranking of Charge"] = f"Yes {details_of_charge.strip()}"
-    else:
-        security_interest_details["Is assetUnder Charge?/ Ranking of Charge"] = "No"
-    # Remove any old keys if present
-    if "Asset Under Charge Ranking" in security_interest_details:
-        del security_interest_details["Asset Under Charge Ranking"]
-    if "is_asset_under_charge_ranking" in security_interest_details:
-        del security_interest_details["is_asset_under_charge_ranking"]
-    security_interest_details["charge_release_date"] = "N/A"
-    
-    # Header info - Use company details from frontend if provided, otherwise extract from PDF
-    if company_details:
-        header_info = {
-            "name_of_company": company_details.get("companyName", "-"),
-            "cin_number": company_details.get("cinNumber", "-"),
-            "search_reference_id": company_details.get("searchReferenceId", safe_get_value(full_text, r"Transaction ID / QRF NO\s*([0-9]+)")),
-            "date_of_incorporation": company_details.get("dateOfIncorporation", "-"),
-            "udin": company_details.get("udin", "-"),  # Add UDIN field
-            "registered_office": company_details.get("registeredOffice", "-")
-        }
-    else:
-        # Fallback to static values and PDF extraction if no company details provided
-        header_info = {
-            "name_of_company": "APRN ENTERPRISES PRIVATE LIMITED",
-            "cin_number": "U21000MH1994PTC084095",
-            "search_reference_id": safe_get_value(full_text, r"Transaction ID / QRF NO\s*([0-9]+)"),
-            "date_of_incorporation": "28.12.1994",
-            "udin": "-",  # Add UDIN field with default value
-            "registered_office": "SUN PARADISE BUSINESS PLAZA, 7 TH FLOOR CITY SURVEY NO 1 A/456 SENAPATI BAPAT MA, RG, Mumbai City, LOWER PAREL MUMBAI, Maharashtra, India, 400013."
-        }
-    return {
-        "asset_details_of_security_interest": asset_details,
-        "security_interest_details": security_interest_details
-    }, header_info
+# --- Request Metrics ---
+@app.before_request
+def start_request_timer():
+    request.environ['metrics.started'] = time.perf_counter()
 
-def process_cersai_reports(pdf_paths, company_details=None):
-    """
-    Processes a list of CERSAI PDF files and returns a consolidated dictionary.
-    """
-    if not pdf_paths:
-        return {"error": "No PDF files provided."}
+@app.after_request
+def record_request_metrics(response):
+    started = request.environ.get('metrics.started')
+    if started is not None:
+        # Route templates, not raw paths, so ids do not explode the label set
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_request_duration_seconds.observe(time.perf_counter() - started, method=request.method, route=route)
+        http_requests_total.inc(method=request.method, route=route, status=str(response.status_code))
+    return response
 
-    final_json_structure = {"company_details": {}, "assets": []}
-    for i, pdf_path in enumerate(pdf_paths):
-        try:
-            asset_data, header_data = extract_data_from_pdf(pdf_path, company_details)
-            if i == 0:
-                final_json_structure["company_details"] = header_data
-            final_json_structure["assets"].append(asset_data)
-        except Exception as e:
-            print(f"Error processing file {pdf_path}: {e}")
-            final_json_structure["assets"].append({
-                "error": f"Failed to process file: {os.path.basename(pdf_path)}",
-                "details": str(e)
-            })
-    return final_json_structure
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 # --- Flask API Endpoints ---
 
+def detach_upload(file):
+    """
+    Copies an upload into a spooled file the request does not own, so a
+    background job can still read it after the response has been sent.
+    """
+    stream = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES, mode='rb+', dir=UPLOAD_SPOOL_DIR)
+    file.stream.seek(0)
+    while chunk := file.stream.read(1024 * 1024):
+        stream.write(chunk)
+    stream.seek(0)
+    return FileStorage(stream=stream, filename=file.filename, content_type=file.content_type)
+
 @app.route('/process', methods=['GET', 'POST'])
 def process_pdf_endpoint():
     if request.method == 'GET':
@@ -283,40 +258,104 @@ def process_pdf_endpoint():
     company_details = None
     if 'companyDetails' in request.form:
         try:
-            import json
             company_details = json.loads(request.form['companyDetails'])
             print(f"📋 Company details received: {company_details.get('companyName', 'N/A')}")
         except json.JSONDecodeError:
             print("⚠️  Failed to parse company details from form data")
 
+    # Optional PDF text backend, e.g. ?backend=pdfium (defaults to PDF_TEXT_BACKEND)
+    backend = request.args.get('backend') or request.form.get('backend')
+    if backend and backend not in text_backends:
+        return jsonify({"error": f"Unknown backend '{backend}'. Choose one of: {', '.join(text_backends)}"}), 400
+
     # Log file upload details
     print(f"📤 Processing {len(files)} file(s):")
     for i, file in enumerate(files):
         print(f"   File {i+1}: {file.filename} ({file.content_type})")
 
-    saved_paths = []
-    with tempfile.TemporaryDirectory() as temp_dir:
-        for file in files:
-            if file and file.filename:
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(temp_dir, filename)
-                file.save(filepath)
-                saved_paths.append(filepath)
-                print(f"   Saved: {filename} -> {filepath}")
-        
-        if not saved_paths:
-            return jsonify({"error": "No valid files to process."}), 400
-            
-        print(f"🔄 Processing {len(saved_paths)} PDF file(s)...")
-        json_output = process_cersai_reports(saved_paths, company_details)
-        print(f"✅ Processing complete")
+    # Uploads are parsed in place from their (memory-spooled) streams
+    uploads = [file for file in files if file and file.filename]
+    if not uploads:
+        return jsonify({"error": "No valid files to process."}), 400
+
+    # Job mode: return a job id straight away and extract in the background
+    if (request.args.get('async') or request.form.get('async', '')).lower() in ('1', 'true', 'yes'):
+        job = job_runner.submit([detach_upload(file) for file in uploads], company_details, backend)
+        print(f"🧾 Queued job {job['job_id']} for {len(uploads)} file(s)")
+        job.update({
+            "status_url": f"/jobs/{job['job_id']}",
+            "events_url": f"/jobs/{job['job_id']}/events",
+        })
+        return jsonify(job), 202
+
+    # Streaming mode: the company_details line first, then one asset per line as files finish
+    if request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson':
+        print(f"🔄 Streaming {len(uploads)} PDF file(s)...")
+
+        # The request's own upload streams are closed before the response body is generated
+        streams = [detach_upload(file) for file in uploads]
+
+        def generate():
+            try:
+                for kind, value in iter_cersai_records(streams, company_details, backend):
+                    if kind == "company_details":
+                        value = {"company_details": value}
+                    elif kind == "asset":
+                        value = value.to_dict()
+                    yield app.json.dumps(value) + "\n"
+                print("✅ Processing complete")
+            finally:
+                for stream in streams:
+                    stream.close()
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+
+    print(f"🔄 Processing {len(uploads)} PDF file(s)...")
+    json_output = process_cersai_reports(uploads, company_details, backend)
+    print("✅ Processing complete")
 
     return jsonify(json_output)
 
+# --- Job Endpoints ---
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_endpoint(job_id):
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events_endpoint(job_id):
+    """Server-sent events: the job (without its result) each time it changes, until it finishes."""
+    job = job_store.get(job_id, include_result=False)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def generate(job):
+        version = None
+        while True:
+            if job["version"] != version:
+                version = job["version"]
+                yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+                if job["status"] not in ("queued", "running"):
+                    return
+            else:
+                yield ": keep-alive\n\n"
+            job_store.wait_for_update(job_id, version, timeout=JOB_EVENTS_POLL_SECONDS)
+            job = job_store.get(job_id, include_result=False) or job
+
+    return Response(stream_with_context(generate(job)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 # --- New API Endpoints ---
 @app.route('/save_summary', methods=['POST'])
 def save_summary_endpoint():
-    if not mongo_client:
+    if not mongo.is_available():
         return jsonify({'error': 'MongoDB not connected'}), 500
     
     data = request.json
@@ -328,95 +367,183 @@ def save_summary_endpoint():
         return jsonify({'error': 'Missing filename or summary'}), 400
     
     # Log the incoming data for debugging
-    print(f"📁 Saving to MongoDB:")
+    print("📁 Saving to MongoDB:")
     print(f"   Filename(s): {pdf_filename}")
     print(f"   Summary keys: {list(summary_json.keys()) if isinstance(summary_json, dict) else 'Not a dict'}")
     if company_details:
         print(f"   Company: {company_details.get('companyName', 'N/A')}")
     
-    pdf_id, summary_id = save_pdf_and_summary(pdf_filename, summary_json, company_details)
+    if data.get('pdf_id'):
+        # Re-save: replaces that summary and its cached exports
+        saved = None
+        if ObjectId.is_valid(data['pdf_id']):
+            saved = resave_pdf_and_summary(data['pdf_id'], pdf_filename, summary_json, company_details)
+        if saved is None:
+            return jsonify({'error': 'Summary not found'}), 404
+        pdf_id, summary_id, version = saved
+    else:
+        pdf_id, summary_id = save_pdf_and_summary(pdf_filename, summary_json, company_details)
+        version = 1
     if pdf_id and summary_id:
         print(f"✅ Saved successfully - PDF ID: {pdf_id}, Summary ID: {summary_id}")
+        # Render the usual downloads now, from the summary in hand
+        export_renderer.prerender(pdf_id, version, summary_json)
         return jsonify({'pdf_id': pdf_id, 'summary_id': summary_id})
     else:
-        print(f"❌ Failed to save to MongoDB")
+        print("❌ Failed to save to MongoDB")
         return jsonify({'error': 'Failed to save to MongoDB'}), 500
 
+@app.route('/save_summaries', methods=['POST'])
+def save_summaries_endpoint():
+    if not mongo.is_available():
+        return jsonify({'error': 'MongoDB not connected'}), 500
+
+    data = request.get_json(silent=True)
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty array of {filename, summary, companyDetails} items'}), 400
+
+    results = save_summaries(summary_collection, asset_collection, items, SAVE_BATCH_SIZE)
+    failed = sum(1 for result in results if 'error' in result)
+    print(f"{'✅' if not failed else '⚠️ '} Saved {len(results) - failed}/{len(results)} summaries")
+    return jsonify({'results': results, 'saved': len(results) - failed, 'failed': failed})
+
 @app.route('/get_summary/<pdf_id>', methods=['GET'])
 def get_summary_endpoint(pdf_id):
-    if not mongo_client:
+    if not mongo.is_available():
         return jsonify({'error': 'MongoDB not connected'}), 500
     
-    summary = get_summary_by_pdf_id(pdf_id)
+    # ?offset=&limit= pages through the assets; ?fields= keeps only those
+    # (dotted) asset fields. Without any of them the whole summary is returned.
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be numbers'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or None
+
+    summary, total, _ = get_summary_page(pdf_id, offset, limit, fields)
     if not summary:
         return jsonify({'error': 'Summary not found'}), 404
-    return jsonify({'summary': summary})
+    if not offset and limit is None and not fields:
+        return jsonify({'summary': summary})
+    shown = len(summary.get('assets') or []) if isinstance(summary, dict) else 0
+    return jsonify({'summary': summary, 'assets_page': {
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'next_offset': offset + shown if offset + shown < total else None,
+    }})
+
+@app.route('/summaries', methods=['GET'])
+def list_summaries_endpoint():
+    """
+    Stored summaries matching the given filters, newest first, without their
+    summary bodies. Follow `next_cursor` with ?cursor= for the next page.
+    """
+    if not mongo.is_available():
+        return jsonify({'error': 'MongoDB not connected'}), 500
+
+    filters = {param: request.args[param].strip() for param in SEARCH_FILTERS if request.args.get(param, '').strip()}
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or None
+    unknown = [field for field in fields or [] if field not in LIST_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(LIST_FIELDS)}"}), 400
+    try:
+        limit = int(request.args.get('limit', SUMMARY_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+
+    try:
+        summaries, next_cursor = search_summaries(
+            summary_collection, filters, request.args.get('cursor') or None, limit, fields
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error searching summaries: {e}")
+        return jsonify({'error': 'Failed to search summaries'}), 500
+    return jsonify({'summaries': summaries, 'next_cursor': next_cursor})
 
 # --- Updated Export Endpoints ---
 @app.route('/export/<pdf_id>/<format>', methods=['GET'])
 def export_summary_endpoint(pdf_id, format):
-    if not mongo_client:
+    if not mongo.is_available():
         return jsonify({'error': 'MongoDB not connected'}), 500
+    if format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format'}), 400
     
-    summary = get_summary_by_pdf_id(pdf_id)
-    if not summary:
+    # Cached renders are looked up by version, without reading the summary
+    version = get_summary_version(pdf_id)
+    if version is None:
         return jsonify({'error': 'Summary not found'}), 404
+    data = export_cache.get(pdf_id, format, version)
+    export_cache_requests_total.inc(format=format, result='hit' if data is not None else 'miss')
     
     try:
-        if format == 'html':
-            html = export_utils.json_to_html(summary)
-            return html, 200, {'Content-Type': 'text/html'}
-        elif format == 'excel':
-            output_path = tempfile.mktemp(suffix='.xlsx')
-            export_utils.json_to_excel(summary, output_path)
-            with open(output_path, 'rb') as f:
-                data = f.read()
-            os.remove(output_path)
-            return data, 200, {
-                'Content-Type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 
-                'Content-Disposition': f'attachment; filename=summary_{pdf_id}.xlsx'
-            }
-        elif format == 'pdf':
-            output_path = tempfile.mktemp(suffix='.pdf')
-            export_utils.json_to_pdf(summary, output_path)
-            with open(output_path, 'rb') as f:
-                data = f.read()
-            os.remove(output_path)
-            return data, 200, {
-                'Content-Type': 'application/pdf', 
-                'Content-Disposition': f'attachment; filename=summary_{pdf_id}.pdf'
-            }
-        else:
-            return jsonify({'error': 'Invalid format'}), 400
+        if data is None:
+            def load_summary():
+                summary, _, loaded_version = get_summary_page(pdf_id)
+                return summary, loaded_version
+
+            # Joins a render of it already in progress (e.g. queued by /save_summary)
+            data = export_renderer.render(pdf_id, format, version, load_summary)
+            if data is None:
+                return jsonify({'error': 'Summary not found'}), 404
+    except RenderPending as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
     except Exception as e:
         return jsonify({'error': f'Export failed: {str(e)}'}), 500
+    
+    content_type, extension = EXPORT_FORMATS[format]
+    headers = {'Content-Type': content_type}
+    if extension:
+        headers['Content-Disposition'] = f'attachment; filename=summary_{pdf_id}.{extension}'
+    return data, 200, headers
 
 # --- Health Check Endpoint ---
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
         "status": "healthy",
-        "mongodb_connected": mongo_client is not None,
+        "mongodb_connected": bool(mongo.connected),
+        "mongodb": mongo.status(),
+        "page_cache": page_fingerprints.stats(),
+        "extraction_pool": extraction_pool.stats(),
+        "export_cache": export_cache.stats(),
+        "export_renderer": export_renderer.stats(),
         "endpoints": {
             "process": "/process",
             "save_summary": "/save_summary", 
+            "save_summaries": "/save_summaries",
             "get_summary": "/get_summary/<pdf_id>",
-            "export": "/export/<pdf_id>/<format>"
+            "summaries": "/summaries",
+            "export": "/export/<pdf_id>/<format>",
+            "job": "/jobs/<job_id>",
+            "job_events": "/jobs/<job_id>/events",
+            "metrics": "/metrics"
         }
     })
 
 # --- Main Execution Block ---
 if __name__ == '__main__':
     print("🚀 Starting Flask server...")
-    print(f"📊 MongoDB URI: Is on")
+    print("📊 MongoDB URI: Is on")
     print("🌐 Server will run at: http://127.0.0.1:5000")
     print("📋 Available endpoints:")
     print("   - GET  /health - Health check")
     print("   - GET  /process - API info")
-    print("   - POST /process - Upload PDFs")
+    print("   - POST /process - Upload PDFs (?async=1 for a background job)")
+    print("   - GET  /jobs/<id> - Job status and result")
+    print("   - GET  /jobs/<id>/events - Job progress stream (SSE)")
     print("   - POST /save_summary - Save to MongoDB")
+    print("   - POST /save_summaries - Save many summaries to MongoDB")
     print("   - GET  /get_summary/<id> - Get summary")
+    print("   - GET  /summaries - Search stored summaries")
     print("   - GET  /export/<id>/<format> - Export files")
+    print("   - GET  /metrics - Prometheus metrics")
     app.run(debug=True, host='0.0.0.0', port=5000)
 
 
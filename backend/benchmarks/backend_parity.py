@@ -0,0 +1,120 @@
+"""
+Runs every PDF text backend over a corpus of CERSAI reports and reports
+pages per second for each backend along with field-level differences in the
+extracted JSON against the reference backend (pdfplumber).
+
+Run from the backend directory:
+    python -m benchmarks.backend_parity --corpus /path/to/reports
+    python -m benchmarks.backend_parity            # synthetic corpus
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+
+from extraction_utils import iter_page_texts, iter_report_blocks, build_asset_record, build_header_info
+from text_backends import text_backends
+from benchmarks.synthetic import write_report_pdf
+
+
+def find_pdfs(corpus):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(corpus)
+        for name in names
+        if name.lower().endswith(".pdf")
+    )
+
+
+def extract(pdf_path, backend):
+    """Returns (report JSON, pages read, seconds spent in the backend)."""
+    stats = {}
+    start = time.perf_counter()
+    page_texts = list(iter_page_texts(pdf_path, stats, backend))
+    elapsed = time.perf_counter() - start
+    blocks = list(iter_report_blocks(page_texts))
+    report = {
+        "company_details": build_header_info(blocks[0][1] or blocks[1][1]),
+        "assets": [build_asset_record(text).to_dict() for kind, text in blocks if kind == "block"],
+    }
+    return report, stats.get("pages_read", 0), elapsed
+
+
+def field_differences(reference, candidate):
+    """Yields (field path, reference value, candidate value) for every differing field."""
+    for key, value in reference["company_details"].items():
+        if candidate["company_details"].get(key) != value:
+            yield f"company_details.{key}", value, candidate["company_details"].get(key)
+    if len(reference["assets"]) != len(candidate["assets"]):
+        yield "assets.count", len(reference["assets"]), len(candidate["assets"])
+    for ref_asset, cand_asset in zip(reference["assets"], candidate["assets"]):
+        for group, fields in ref_asset.items():
+            for key, value in fields.items():
+                other = cand_asset.get(group, {}).get(key)
+                if other != value:
+                    yield f"{group}.{key}", value, other
+
+
+def synthetic_corpus(directory):
+    specs = [(5, 1, 1), (20, 3, 2), (60, 10, 1)]
+    return [
+        write_report_pdf(os.path.join(directory, f"synthetic_{pages}p_{assets}a.pdf"), pages, assets, borrowers, seed=pages)
+        for pages, assets, borrowers in specs
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory searched recursively for PDFs (default: synthetic reports)")
+    parser.add_argument("--backends", nargs="+", default=list(text_backends), choices=list(text_backends))
+    parser.add_argument("--reference", default="pdfplumber", choices=list(text_backends))
+    parser.add_argument("--verbose", action="store_true", help="Print every differing field")
+    parser.add_argument("--json", help="Write the full results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_paths = find_pdfs(args.corpus) if args.corpus else synthetic_corpus(temp_dir)
+        backends = [args.reference] + [name for name in args.backends if name != args.reference]
+        totals = {name: {"pages": 0, "seconds": 0.0, "files_differing": 0, "fields": Counter()} for name in backends}
+        for pdf_path in pdf_paths:
+            reference = None
+            for name in backends:
+                try:
+                    report, pages, seconds = extract(pdf_path, name)
+                except Exception as e:
+                    print(f"❌ {name} failed on {pdf_path}: {e}")
+                    totals[name]["files_differing"] += 1
+                    totals[name]["fields"]["<error>"] += 1
+                    continue
+                totals[name]["pages"] += pages
+                totals[name]["seconds"] += seconds
+                if reference is None:
+                    reference = report
+                    continue
+                differences = list(field_differences(reference, report))
+                if differences:
+                    totals[name]["files_differing"] += 1
+                for path, expected, actual in differences:
+                    totals[name]["fields"][path] += 1
+                    if args.verbose:
+                        print(f"{os.path.basename(pdf_path)} [{name}] {path}: {expected!r} != {actual!r}")
+
+    print(f"\n{len(pdf_paths)} file(s), reference backend: {args.reference}")
+    for name, total in totals.items():
+        pages_per_second = total["pages"] / total["seconds"] if total["seconds"] else 0.0
+        print(
+            f"  {name:<11} {total['pages']:>6} pages {total['seconds']:8.2f} s {pages_per_second:8.1f} pages/s | "
+            f"files differing: {total['files_differing']}"
+        )
+        for path, count in total["fields"].most_common():
+            print(f"      {path}: {count}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({name: dict(total, fields=dict(total["fields"])) for name, total in totals.items()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
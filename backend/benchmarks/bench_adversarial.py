@@ -0,0 +1,181 @@
+"""
+Worst-case extraction time per document on malformed and adversarial report
+text: field patterns matched within bounded windows (FIELD_WINDOW_CHARS) and
+with a per-document time budget, versus unbounded matching, where a lazy
+`.*?` or a run-on line can backtrack across the whole document.
+
+Each case builds text of the given sizes and times `build_asset_record` on
+it; the fuzz case mutates genuine security interest blocks at random (joined
+lines, dropped terminators, duplicated labels, inserted garbage) and reports
+the slowest of its documents. Unbounded matching is only run up to
+--unbounded-max characters, past which it takes minutes. With --pdf-pages, a
+synthetic PDF is also extracted end to end with the given --budget to show
+partial results coming back on time. Run from the backend directory:
+    python -m benchmarks.bench_adversarial --sizes 20000 100000 1000000
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from contextlib import contextmanager
+
+import extraction_utils
+from extraction_utils import build_asset_record, field_extractor, TimeBudgetExceeded
+from benchmarks.synthetic import security_interest_block, write_report_pdf
+
+
+def _holder_prefix(index=0):
+    block = security_interest_block(index, borrowers=2)
+    return block[:block.index("Original View")]
+
+
+def unterminated_holder(size, rng):
+    """Charge holder labels repeated with no "Original View" / "Transaction History" after them."""
+    unit = "Charge Holder Name Office / Ward / Branch Name STATE BANK OF INDIA LOWER PAREL BRANCH\n"
+    return _holder_prefix() + unit * (size // len(unit))
+
+
+def run_on_asset_line(size, rng):
+    """One asset line holding the plot label over and over, never followed by "Area" or a line break."""
+    unit = "Plot Number 12 Building "
+    return "Asset Details\nAsset ID 200010000000\n" + unit * (size // len(unit))
+
+
+def run_on_borrower_row(size, rng):
+    """A borrower row that never reaches its "NA Yes/No" ending."""
+    unit = "Company BORROWER PRIVATE LIMITED "
+    return "Borrower(s) Details\n1 Non-Individual " + unit * (size // len(unit)) + "\nCharge Holder Details\n"
+
+
+def _mutate(lines, rng):
+    operation = rng.randrange(5)
+    index = rng.randrange(len(lines))
+    if operation == 0 and index + 1 < len(lines):
+        # Line break lost
+        lines[index:index + 2] = [lines[index] + " " + lines[index + 1]]
+    elif operation == 1 and lines[index] in ("Original View", "Transaction History", "Charge Holder Details"):
+        del lines[index]
+    elif operation == 2:
+        lines.insert(rng.randrange(len(lines)), lines[index])
+    elif operation == 3:
+        garbage = "".join(rng.choice(string.ascii_letters + string.digits + " /-.") for _ in range(rng.randint(1, 200)))
+        lines.insert(index, garbage)
+    else:
+        # Labels glued onto one another
+        lines[index] = lines[index] + " " + rng.choice(lines).split(" ", 3)[0] * rng.randint(1, 50)
+
+
+def fuzzed(size, rng):
+    """Genuine blocks mutated at random until the text reaches `size` characters."""
+    lines = []
+    index = 0
+    while sum(len(line) + 1 for line in lines) < size:
+        lines += security_interest_block(index, borrowers=rng.randint(1, 4), rng=random.Random(rng.random())).split("\n")
+        index += 1
+    for _ in range(max(1, len(lines) // 2)):
+        _mutate(lines, rng)
+    for line in rng.sample(["Original View", "Transaction History"], 2):
+        lines = [existing for existing in lines if existing != line]
+    return "\n".join(lines)
+
+
+CASES = {
+    "unterminated_holder": unterminated_holder,
+    "run_on_asset_line": run_on_asset_line,
+    "run_on_borrower_row": run_on_borrower_row,
+    "fuzzed": fuzzed,
+}
+
+
+# Longer than any document, and still a valid string offset
+UNBOUNDED = 2 ** 40
+
+
+@contextmanager
+def unbounded():
+    """Matches fields and borrower rows without windows, the way extraction used to."""
+    saved = field_extractor.window, extraction_utils.BORROWER_ROW_WINDOW
+    field_extractor.window = extraction_utils.BORROWER_ROW_WINDOW = UNBOUNDED
+    try:
+        yield
+    finally:
+        field_extractor.window, extraction_utils.BORROWER_ROW_WINDOW = saved
+
+
+def time_record(text, budget=None):
+    """Seconds taken by `build_asset_record`, and whether it ran out of budget."""
+    deadline = time.monotonic() + budget if budget else None
+    start = time.perf_counter()
+    try:
+        build_asset_record(text, deadline=deadline)
+        truncated = False
+    except TimeBudgetExceeded:
+        truncated = True
+    return time.perf_counter() - start, truncated
+
+
+def run_case(name, size, args):
+    rng = random.Random(args.seed)
+    documents = [CASES[name](size, rng) for _ in range(args.fuzz_docs if name == "fuzzed" else 1)]
+    row = {}
+    if size <= args.unbounded_max:
+        with unbounded():
+            row["unbounded"] = max(time_record(text)[0] for text in documents)
+    row["bounded"] = max(time_record(text)[0] for text in documents)
+    timings = [time_record(text, args.budget) for text in documents]
+    row["budget"] = max(seconds for seconds, _ in timings)
+    row["truncated"] = sum(truncated for _, truncated in timings)
+    return len(documents), row
+
+
+def run_pdf(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        path = write_report_pdf(os.path.join(workdir, "large.pdf"), args.pdf_pages, assets=args.pdf_pages // 2,
+                                borrowers=2, ruled_tables=True)
+        saved = extraction_utils.EXTRACTION_TIME_BUDGET
+        extraction_utils.EXTRACTION_TIME_BUDGET = args.budget
+        try:
+            start = time.perf_counter()
+            report = extraction_utils._extract_file(path)
+            elapsed = time.perf_counter() - start
+        finally:
+            extraction_utils.EXTRACTION_TIME_BUDGET = saved
+    print(f"\n📄 {args.pdf_pages}-page PDF with a {args.budget:g}s budget: {elapsed:.2f}s, "
+          f"{len(report['assets'])} asset(s) from {report['pages']} page(s), "
+          f"{'truncated' if report.get('truncated') else 'complete'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000, 1_000_000],
+                        help="document sizes in characters")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--budget", type=float, default=1.0, help="per-document time budget in seconds")
+    parser.add_argument("--fuzz-docs", type=int, default=20, help="documents per size for the fuzzed case")
+    parser.add_argument("--unbounded-max", type=int, default=100_000,
+                        help="largest size to time unbounded matching at")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pdf-pages", type=int, default=0, help="also extract a synthetic PDF of this many pages")
+    args = parser.parse_args()
+
+    print(f"Field window {field_extractor.window} chars, borrower row window "
+          f"{extraction_utils.BORROWER_ROW_WINDOW} chars, budget {args.budget:g}s")
+    print(f"{'case':<22}{'chars':>10}{'docs':>6}{'unbounded':>12}{'bounded':>12}{'budget':>12}{'truncated':>11}")
+    worst = 0.0
+    for name in args.cases:
+        for size in args.sizes:
+            documents, row = run_case(name, size, args)
+            unbounded_time = f"{row['unbounded']:.3f}s" if "unbounded" in row else "-"
+            print(f"{name:<22}{size:>10}{documents:>6}{unbounded_time:>12}{row['bounded']:>11.3f}s"
+                  f"{row['budget']:>11.3f}s{row['truncated']:>11}", flush=True)
+            worst = max(worst, row["budget"])
+    print(f"Worst case with the budget: {worst:.3f}s per document")
+
+    if args.pdf_pages:
+        run_pdf(args)
+
+
+if __name__ == "__main__":
+    main()
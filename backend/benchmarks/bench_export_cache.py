@@ -0,0 +1,52 @@
+"""
+Time to serve an export rendered from scratch against a hit in the
+rendered-export cache, per format, for a summary of --assets assets.
+Offline: the cache lives in a temporary directory and MongoDB is not used.
+Run from the backend directory:
+    python -m benchmarks.bench_export_cache --assets 500 --repeat 5
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from export_cache import ExportCache
+from export_utils import export_utils, EXPORT_FORMATS, EXPORTER_VERSION
+from benchmarks.bench_summary_store import make_summary
+
+
+def median_seconds(func, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--formats", nargs="+", default=list(EXPORT_FORMATS), choices=list(EXPORT_FORMATS))
+    args = parser.parse_args()
+
+    summary = make_summary(0, args.assets)
+    pdf_id = "0" * 24
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ExportCache(EXPORTER_VERSION, directory=directory)
+        print(f"📊 summary of {args.assets} assets, median of {args.repeat} runs")
+        for format in args.formats:
+            rendered = median_seconds(lambda: export_utils.render(summary, format), args.repeat)
+            data = export_utils.render(summary, format)
+            cache.put(pdf_id, format, 1, data)
+            # A fresh instance, as in another worker or after a restart
+            cached = median_seconds(
+                lambda: ExportCache(EXPORTER_VERSION, directory=directory).get(pdf_id, format, 1), args.repeat
+            )
+            print(f"  {format:<6} {len(data) / 1024:9.0f} KiB   render {rendered * 1000:9.1f} ms   "
+                  f"cached {cached * 1000:7.2f} ms   ({rendered / cached:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-document field extraction time: per-field `safe_get_value` calls versus
+the precompiled `FieldExtractor`.
+
+Run from the backend directory:
+    python -m benchmarks.bench_field_extractor --pages 200 --repeat 50
+"""
+import argparse
+import re
+import time
+
+from extraction_utils import (
+    asset_field_map, security_field_map, report_field_map,
+    safe_get_value, field_extractor,
+)
+from benchmarks.synthetic import make_report_text
+
+
+def extract_per_call(text):
+    """The pre-FieldExtractor behaviour: one `re.search` per field."""
+    return {
+        name: {key: safe_get_value(text, pattern) for key, pattern in field_map.items()}
+        for name, field_map in (
+            ("asset", asset_field_map),
+            ("security", security_field_map),
+            ("report", report_field_map),
+        )
+    }
+
+
+def time_per_doc(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for pages in args.pages:
+        text = make_report_text(pages=pages)
+        assert extract_per_call(text) == field_extractor.extract(text), "extractor output differs"
+        # Clearing the `re` cache makes every per-call lookup pay compilation,
+        # which is what happens once the module cache is churned by other code.
+        before_cold = time_per_doc(lambda t: (re.purge(), extract_per_call(t)), text, args.repeat)
+        before = time_per_doc(extract_per_call, text, args.repeat)
+        after = time_per_doc(field_extractor.extract, text, args.repeat)
+        print(
+            f"{pages:>5} pages {len(text):>9,} chars | "
+            f"per-call {before * 1000:8.3f} ms (cold re cache {before_cold * 1000:8.3f} ms) | "
+            f"FieldExtractor {after * 1000:8.3f} ms | {before / after:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
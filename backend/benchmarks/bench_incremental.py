@@ -0,0 +1,60 @@
+"""
+Pages read and time of `extract_data_from_pdf` with and without
+`incremental`, on synthetic reports rendered with ReportLab. Incremental
+mode reads the first security interest block through
+`iter_security_interests` and stops once the second block starts, so the
+pages saved grow with the number of blocks after the first. Also checks
+both modes return the same record. Run from the backend directory:
+    python -m benchmarks.bench_incremental --pages 20 150 --assets 1 10 40
+    BORROWER_TABLES=1 python -m benchmarks.bench_incremental --ruled-tables
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from extraction_utils import extract_data_from_pdf
+from text_backends import text_backends, DEFAULT_TEXT_BACKEND
+from benchmarks.synthetic import write_report_pdf
+
+
+def run(path, incremental, backend, repeat):
+    stats = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        stats = {}
+        # Incremental runs log their page counts
+        with contextlib.redirect_stdout(io.StringIO()):
+            asset_data, header_info = extract_data_from_pdf(path, incremental=incremental, stats=stats, backend=backend)
+    return (time.perf_counter() - start) / repeat, stats, (asset_data.to_dict(), header_info)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 150])
+    parser.add_argument("--assets", type=int, nargs="+", default=[1, 10, 40])
+    parser.add_argument("--borrowers", type=int, default=2)
+    parser.add_argument("--ruled-tables", action="store_true", help="draw borrower tables as ruled tables")
+    parser.add_argument("--backend", choices=list(text_backends), default=DEFAULT_TEXT_BACKEND)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for pages in args.pages:
+            for assets in args.assets:
+                path = write_report_pdf(os.path.join(workdir, f"report-{pages}-{assets}.pdf"), pages, assets,
+                                        args.borrowers, ruled_tables=args.ruled_tables)
+                full, full_stats, full_record = run(path, False, args.backend, args.repeat)
+                fast, fast_stats, fast_record = run(path, True, args.backend, args.repeat)
+                print(
+                    f"{pages:>5} pages {assets:>3} assets | full {full * 1000:8.1f} ms, "
+                    f"{full_stats['pages_read']:>4} pages read | incremental {fast * 1000:8.1f} ms, "
+                    f"{fast_stats['pages_read']:>4} pages read ({full / fast:4.1f}x) | "
+                    f"same record: {'yes' if fast_record == full_record else 'NO'}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Extraction time with and without the boilerplate page cache, over a stream
+of synthetic reports that share their cover and disclaimer pages but not
+their data. The first PAGE_CACHE_MIN_SIGHTINGS reports teach the cache; the
+skip rate and time per report are shown for the rest, and every report's
+assets are checked to be identical either way. The learned fingerprints are
+then saved and reloaded, as after a restart. Run from the backend directory:
+    python -m benchmarks.bench_page_cache --docs 12 --pages 40 --assets 6
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import extraction_utils
+from extraction_utils import iter_file_reports, page_has_fields, EXTRACTOR_VERSION
+from page_cache import PageFingerprintCache, PAGE_CACHE_MIN_SIGHTINGS
+from benchmarks.synthetic import write_report_pdf
+
+
+def extract_all(paths, backend, cache):
+    """Per-report seconds and assets, extracting one report at a time with `cache` as the page cache."""
+    saved = extraction_utils.page_fingerprints
+    extraction_utils.page_fingerprints = cache
+    try:
+        seconds, assets = [], []
+        for path in paths:
+            start = time.perf_counter()
+            for _, report in iter_file_reports([path], backend, max_workers=1, use_cache=False):
+                assets.append([asset.to_dict() for asset in report["assets"]])
+            seconds.append(time.perf_counter() - start)
+        return seconds, assets
+    finally:
+        extraction_utils.page_fingerprints = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=12)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--assets", type=int, default=6)
+    parser.add_argument("--borrowers", type=int, default=2)
+    parser.add_argument("--backends", nargs="+", default=["pdfplumber", "pdfminer"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = [
+            write_report_pdf(os.path.join(workdir, f"report-{i}.pdf"), args.pages, args.assets, args.borrowers,
+                             seed=i, ruled_tables=True)
+            for i in range(args.docs)
+        ]
+        cache_path = os.path.join(workdir, "page_fingerprints.json")
+        warmup = PAGE_CACHE_MIN_SIGHTINGS
+        print(f"{args.docs} reports of {args.pages} pages ({args.assets} assets); "
+              f"the first {warmup} teach the cache")
+        for backend in args.backends:
+            disabled = PageFingerprintCache(page_has_fields, EXTRACTOR_VERSION, path=None, max_entries=0)
+            cache = PageFingerprintCache(page_has_fields, EXTRACTOR_VERSION, path=cache_path)
+            before, expected = extract_all(paths, backend, disabled)
+            after, assets = extract_all(paths, backend, cache)
+            assert assets == expected, f"{backend}: skipping boilerplate pages changed the extracted assets"
+            cache.save()
+
+            stats = cache.stats()
+            per_doc_before = sum(before[warmup:]) / max(1, len(before) - warmup)
+            per_doc_after = sum(after[warmup:]) / max(1, len(after) - warmup)
+            print(f"\n{backend}:")
+            print(f"  skip rate      {stats['skip_rate'] * 100:5.1f}% ({stats['pages_skipped']} of "
+                  f"{stats['pages_checked']} pages, {stats['boilerplate']} boilerplate fingerprints)")
+            print(f"  per report     {per_doc_before * 1000:8.1f} ms without cache, {per_doc_after * 1000:8.1f} ms with "
+                  f"({(1 - per_doc_after / per_doc_before) * 100:.0f}% faster)")
+
+            reloaded = PageFingerprintCache(page_has_fields, EXTRACTOR_VERSION, path=cache_path)
+            reloaded.session()
+            print(f"  after restart  {reloaded.stats()['boilerplate']} boilerplate fingerprints reloaded from disk")
+            os.remove(cache_path)
+
+
+if __name__ == "__main__":
+    main()
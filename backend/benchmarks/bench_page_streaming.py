@@ -0,0 +1,87 @@
+"""
+Peak memory and time of report text extraction against page count: the
+original `full_text +=` loop that keeps every page's layout cached until the
+PDF is closed, versus `iter_page_texts`, which releases each page as it goes.
+
+Each measurement runs in a fresh process so peak RSS is not shared between
+runs. Run from the backend directory:
+    python -m benchmarks.bench_page_streaming --pages 50 150 300
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pdfplumber
+
+from extraction_utils import iter_page_texts
+from benchmarks.synthetic import write_report_pdf
+
+
+def concatenated_text(pdf_path):
+    """The original extraction loop."""
+    with pdfplumber.open(pdf_path) as pdf:
+        full_text = ""
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                full_text += page_text + "\n"
+    return full_text
+
+
+def streamed_text(pdf_path):
+    return "".join(page_text + "\n" for page_text in iter_page_texts(pdf_path))
+
+
+MODES = {"concatenated": concatenated_text, "streamed": streamed_text}
+
+
+def run_child(mode, pdf_path):
+    start = time.perf_counter()
+    text = MODES[mode](pdf_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": elapsed,
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != "darwin" else 1024 * 1024),
+        "sha256": hashlib.sha256(text.encode()).hexdigest(),
+    }))
+
+
+def measure(mode, pdf_path):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_page_streaming", "--child", mode, pdf_path],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[25, 50, 100])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for pages in args.pages:
+            pdf_path = write_report_pdf(os.path.join(temp_dir, f"report_{pages}.pdf"), pages=pages, assets=max(1, pages // 10))
+            results = {mode: measure(mode, pdf_path) for mode in MODES}
+            assert len({result["sha256"] for result in results.values()}) == 1, "extracted text differs"
+            print(f"{pages:>5} pages | " + " | ".join(
+                f"{mode} {result['peak_rss_mib']:7.1f} MiB peak RSS {result['seconds']:6.2f} s"
+                for mode, result in results.items()
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Memory held by extracted asset records: slotted AssetRecord objects versus
+the nested dicts they turn into at the JSON boundary (the form records used
+to travel in through the whole pipeline).
+
+Records are cloned from ones extracted out of synthetic security interest
+blocks, with unique ids so no two records share every string. Each form is
+measured in a fresh process with tracemalloc. Run from the backend directory:
+    python -m benchmarks.bench_record_memory --records 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from extraction_records import AssetDetails, SecurityInterest, AssetRecord
+from extraction_utils import build_asset_record
+from benchmarks.synthetic import security_interest_block
+
+TEMPLATES = 50
+
+
+def make_records(count, as_dicts):
+    templates = [build_asset_record(security_interest_block(i, borrowers=1 + i % 3)).to_dict() for i in range(TEMPLATES)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = []
+    for i in range(count):
+        template = templates[i % TEMPLATES]
+        asset = dict(template["asset_details_of_security_interest"], asset_id=str(200010000000 + i))
+        security = dict(template["security_interest_details"], security_interest_id=str(400010000000 + i))
+        security["borrower_details"] = [dict(borrower) for borrower in security["borrower_details"]]
+        record = AssetRecord(AssetDetails.from_dict(asset), SecurityInterest.from_dict(security))
+        records.append(record.to_dict() if as_dicts else record)
+        del asset, security, record
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, current, elapsed
+
+
+def run_child(mode, count):
+    records, current, elapsed = make_records(count, mode == "dicts")
+    output = [record if isinstance(record, dict) else record.to_dict() for record in records[:TEMPLATES]]
+    print(json.dumps({"bytes": current, "build_seconds": elapsed, "sample": json.dumps(output)}))
+
+
+def measure(mode, count):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_record_memory", "--child", mode, str(count)],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    results = {mode: measure(mode, args.records) for mode in ("dicts", "records")}
+    assert results["dicts"]["sample"] == results["records"]["sample"], "records serialise differently"
+    for mode, result in results.items():
+        print(f"{mode:>8}: {result['bytes'] / 2**20:8.1f} MiB for {args.records} records "
+              f"({result['bytes'] / args.records:6.0f} B/record), built in {result['build_seconds']:.2f}s")
+    print(f"   saved: {(1 - results['records']['bytes'] / results['dicts']['bytes']) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
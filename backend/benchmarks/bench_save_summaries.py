@@ -0,0 +1,87 @@
+"""
+Throughput of saving summaries one request at a time (POST /save_summary,
+one insert_one each) against POST /save_summaries (unordered insert_many in
+SAVE_BATCH_SIZE chunks), both through the Flask test client so request
+handling is counted but network latency is not. Every saved id is read back
+to check nothing was lost. Runs in a scratch database that is dropped
+afterwards. Run from the backend directory with mongod listening on
+MONGODB_URI:
+    python -m benchmarks.bench_save_summaries --summaries 5000 --batch-sizes 100 500 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from bson.objectid import ObjectId
+
+from benchmarks.bench_summary_store import make_summary
+
+
+def make_items(count, assets):
+    templates = [make_summary(i, assets) for i in range(20)]
+    return [
+        {"filename": f"report-{i}.pdf", "summary": templates[i % len(templates)], "companyDetails": None}
+        for i in range(count)
+    ]
+
+
+def check_saved(collection, pdf_ids):
+    found = collection.count_documents({"pdf_id": {"$in": [ObjectId(pdf_id) for pdf_id in pdf_ids]}})
+    assert found == len(pdf_ids), f"{len(pdf_ids) - found} saved summaries are missing"
+
+
+def report(name, count, seconds, baseline=None):
+    speedup = f"   {baseline / seconds:5.1f}x" if baseline else ""
+    print(f"  {name:<32} {count / seconds:9.0f} summaries/s   {seconds:7.2f}s{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=5000)
+    parser.add_argument("--assets", type=int, default=2, help="assets per summary")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 1000],
+                        help="SAVE_BATCH_SIZE values to time /save_summaries with")
+    parser.add_argument("--request-size", type=int, default=5000, help="items per /save_summaries request")
+    parser.add_argument("--db", default="digestadoc_bench", help="scratch database")
+    args = parser.parse_args()
+
+    os.environ["MONGODB_DB"] = args.db
+    import app
+
+    if not app.mongo.wait_until_checked(timeout=30):
+        sys.exit("❌ No MongoDB at MONGODB_URI")
+    client = app.app.test_client()
+    items = make_items(args.summaries, args.assets)
+    print(f"📊 {args.summaries} summaries of {args.assets} assets")
+    try:
+        start = time.perf_counter()
+        pdf_ids = []
+        # /save_summary logs every save
+        with contextlib.redirect_stdout(io.StringIO()):
+            for item in items:
+                response = client.post("/save_summary", json=item)
+                pdf_ids.append(response.get_json()["pdf_id"])
+        single = time.perf_counter() - start
+        check_saved(app.summary_collection, pdf_ids)
+        report("/save_summary (one per request)", len(items), single)
+
+        for batch_size in args.batch_sizes:
+            app.SAVE_BATCH_SIZE = batch_size
+            start = time.perf_counter()
+            results = []
+            for offset in range(0, len(items), args.request_size):
+                response = client.post("/save_summaries", json=items[offset:offset + args.request_size])
+                results.extend(response.get_json()["results"])
+            seconds = time.perf_counter() - start
+            assert not [result for result in results if "error" in result], "bulk save reported errors"
+            check_saved(app.summary_collection, [result["pdf_id"] for result in results])
+            report(f"/save_summaries (batch {batch_size})", len(items), seconds, baseline=single)
+    finally:
+        app.mongo_client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Field extraction over the whole report text versus section-indexed
+extraction, where each field only searches its own section. Timed on whole
+reports and on the single security-interest blocks `iter_security_interests`
+actually extracts.
+
+The "malformed" variant drops the "Original View" / "Transaction History"
+terminators and one asset's fields, which is where whole-text matching both
+scans furthest and picks up values from another section.
+
+Run from the backend directory:
+    python -m benchmarks.bench_section_index --pages 50 600 --assets 40
+"""
+import argparse
+import time
+
+from extraction_utils import SectionIndex, field_extractor, iter_report_blocks
+from benchmarks.synthetic import make_report_text
+
+
+def whole_text(text):
+    return field_extractor.extract(text)
+
+
+def section_indexed(text):
+    return field_extractor.extract(text, SectionIndex(text))
+
+
+def malformed(text):
+    text = text.replace("Original View", "").replace("Transaction History", "")
+    # First asset block loses its landmark and pin code lines
+    return text.replace("Landmark", "", 1).replace("Pin Code / Post Code", "", 1)
+
+
+def time_per_doc(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def first_block(text):
+    return next(block for kind, block in iter_report_blocks(iter(text.split("\n\n"))) if kind == "block")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 600])
+    parser.add_argument("--assets", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for pages in args.pages:
+        clean = make_report_text(pages=pages, assets=args.assets)
+        variants = (
+            ("clean", clean),
+            ("malformed", malformed(clean)),
+            ("block", first_block(clean)),
+            ("bad block", first_block(malformed(clean))),
+        )
+        for variant, text in variants:
+            before = time_per_doc(whole_text, text, args.repeat)
+            after = time_per_doc(section_indexed, text, args.repeat)
+            old, new = whole_text(text), section_indexed(text)
+            changed = sorted(
+                key for name in old for key in old[name] if old[name][key] != new[name][key]
+            )
+            print(
+                f"{pages:>5} pages {variant:<9} | whole text {before * 1000:8.3f} ms | "
+                f"sectioned {after * 1000:8.3f} ms | "
+                f"fields that differ: {', '.join(changed) or 'none'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
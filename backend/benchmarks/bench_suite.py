@@ -0,0 +1,175 @@
+"""
+End-to-end performance suite: generates synthetic CERSAI reports with
+ReportLab (ruled borrower tables included) and times, in-process,
+`extract_data_from_pdf`, `process_cersai_reports` over a batch of reports,
+and each `ExportUtils` format rendering that batch's summary. Nothing talks to
+MongoDB or a running server, and the extraction cache and boilerplate page
+cache are both off, so no run is sped up by an earlier one.
+
+Results are written as JSON so runs can be compared. Given a baseline from an
+earlier run, every case whose median got slower than the threshold allows is
+reported as a regression and the exit status is 1. Run from the backend
+directory:
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --baseline bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Read when extraction_utils is imported, here and in pool workers. Left on,
+# the page cache would learn the repeated disclaimer pages during warmup and
+# save them to the server's fingerprint file.
+os.environ["PAGE_CACHE_SIZE"] = "0"
+os.environ["PAGE_CACHE_PATH"] = ""
+
+from extraction_utils import extract_data_from_pdf, process_cersai_reports, EXTRACTOR_VERSION, EXTRACTION_WORKERS
+from export_utils import export_utils
+from text_backends import text_backends, DEFAULT_TEXT_BACKEND
+from benchmarks.synthetic import write_report_pdf
+
+# name: (pages, assets, borrowers)
+DEFAULT_SCENARIOS = {
+    "small": (5, 2, 1),
+    "medium": (30, 10, 2),
+    "large": (150, 40, 3),
+}
+
+COMPANY_DETAILS = {
+    "companyName": "APRN ENTERPRISES PRIVATE LIMITED",
+    "cinNumber": "U45200MH2005PTC151234",
+    "searchReferenceId": "-",
+    "dateOfIncorporation": "01-04-2005",
+    "udin": "-",
+    "registeredOffice": "LOWER PAREL, MUMBAI",
+}
+
+
+def parse_scenario(value):
+    """NAME=PAGES,ASSETS,BORROWERS"""
+    try:
+        name, sizes = value.split("=", 1)
+        pages, assets, borrowers = (int(part) for part in sizes.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=PAGES,ASSETS,BORROWERS, got {value!r}")
+    return name, (pages, assets, borrowers)
+
+
+def time_case(func, repeat, warmup):
+    for _ in range(warmup):
+        func()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {"median_seconds": statistics.median(runs), "min_seconds": min(runs), "runs": runs}
+
+
+def run_scenario(name, sizes, args, workdir):
+    pages, assets, borrowers = sizes
+    paths = [
+        write_report_pdf(os.path.join(workdir, f"{name}-{i}.pdf"), pages, assets, borrowers, seed=i, ruled_tables=True)
+        for i in range(args.files)
+    ]
+    summary = process_cersai_reports(paths, COMPANY_DETAILS, args.backend, args.workers, use_cache=False)
+    excel_path = os.path.join(workdir, f"{name}.xlsx")
+    pdf_path = os.path.join(workdir, f"{name}-export.pdf")
+
+    cases = {
+        "extract_data_from_pdf": lambda: extract_data_from_pdf(paths[0], COMPANY_DETAILS, backend=args.backend),
+        "process_cersai_reports": lambda: process_cersai_reports(
+            paths, COMPANY_DETAILS, args.backend, args.workers, use_cache=False),
+        "export_html": lambda: export_utils.json_to_html(summary),
+        "export_excel": lambda: export_utils.json_to_excel(summary, excel_path),
+        "export_pdf": lambda: export_utils.json_to_pdf(summary, pdf_path),
+    }
+    results = {}
+    for case, func in cases.items():
+        if args.cases and case not in args.cases:
+            continue
+        results[f"{name}/{case}"] = result = time_case(func, args.repeat, args.warmup)
+        print(f"  {name + '/' + case:<36} median {result['median_seconds'] * 1000:9.1f} ms"
+              f"   min {result['min_seconds'] * 1000:9.1f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Cases slower than the baseline by more than `threshold` (and `min_delta` seconds)."""
+    regressions = []
+    print(f"\nAgainst baseline from {baseline['meta'].get('started', '?')} (threshold +{threshold * 100:.0f}%):")
+    for case, result in results.items():
+        before = baseline["results"].get(case)
+        if before is None:
+            print(f"  {case:<36} new case")
+            continue
+        old, new = before["median_seconds"], result["median_seconds"]
+        change = (new - old) / old if old else 0.0
+        regressed = change > threshold and new - old > min_delta
+        flag = "  ❌ REGRESSION" if regressed else ""
+        print(f"  {case:<36} {old * 1000:9.1f} -> {new * 1000:9.1f} ms ({change * 100:+6.1f}%){flag}")
+        if regressed:
+            regressions.append(case)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", type=parse_scenario, action="append",
+                        help="NAME=PAGES,ASSETS,BORROWERS, repeatable (default: small, medium, large)")
+    parser.add_argument("--files", type=int, default=4, help="reports per process_cersai_reports batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--cases", nargs="+", help="only run these cases, e.g. extract_data_from_pdf export_pdf")
+    parser.add_argument("--backend", choices=list(text_backends), default=DEFAULT_TEXT_BACKEND)
+    parser.add_argument("--workers", type=int, default=EXTRACTION_WORKERS)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown of a median, as a fraction")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    scenarios = dict(args.scenario) if args.scenario else DEFAULT_SCENARIOS
+    meta = {
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "extractor_version": EXTRACTOR_VERSION,
+        "backend": args.backend,
+        "workers": args.workers,
+        "files": args.files,
+        "repeat": args.repeat,
+        "scenarios": {name: dict(zip(("pages", "assets", "borrowers"), sizes)) for name, sizes in scenarios.items()},
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, sizes in scenarios.items():
+            print(f"📊 {name}: {sizes[0]} pages, {sizes[1]} assets, {sizes[2]} borrowers x {args.files} files")
+            results.update(run_scenario(name, sizes, args, workdir))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
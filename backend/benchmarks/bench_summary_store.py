@@ -0,0 +1,139 @@
+"""
+Save and get latency of stored summaries against a local mongod, with the
+collection seeded to --summaries documents (1M by default).
+
+Saves are timed through `save_pdf_and_summary` (one insert) and through the
+three round trips it used to make (insert pdf, insert summary, update pdf).
+Gets are timed through `get_summary_by_pdf_id` with the startup indexes in
+place and, for comparison, with the pdf_id index dropped (a collection
+scan; only --scan-samples of those). Listings are timed through
+`search_summaries`: the first page, a page --deep-pages cursors in, and a
+CIN filter, each of which should cost the same at any collection size.
+Everything runs in a scratch database
+that is dropped afterwards unless --keep is given. Run from the backend
+directory with mongod listening on MONGODB_URI:
+    python -m benchmarks.bench_summary_store --summaries 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+
+from extraction_utils import build_asset_record, apply_company_details
+from summary_utils import search_fields, search_summaries
+from benchmarks.synthetic import security_interest_block
+
+
+def make_summary(index, assets):
+    return {
+        "company_details": apply_company_details(str(100000000000 + index)),
+        "assets": [build_asset_record(security_interest_block(index + i, borrowers=2)).to_dict() for i in range(assets)],
+    }
+
+
+def seed(collection, count, assets, batch_size=5000):
+    """Fills the collection up to `count` summaries shaped like `save_pdf_and_summary` writes them."""
+    existing = collection.estimated_document_count()
+    templates = [make_summary(i, assets) for i in range(20)]
+    start = time.perf_counter()
+    for offset in range(existing, count, batch_size):
+        now = datetime.now(timezone.utc)
+        collection.insert_many([
+            {
+                "_id": ObjectId(),
+                "pdf_id": ObjectId(),
+                "pdf": {"filename": f"report-{offset + i}.pdf", "company_details": None},
+                "summary": templates[(offset + i) % len(templates)],
+                "created_at": now,
+                **search_fields(templates[(offset + i) % len(templates)]),
+            }
+            for i in range(min(batch_size, count - offset))
+        ], ordered=False)
+        print(f"\r🌱 {min(offset + batch_size, count)}/{count} summaries", end="", flush=True)
+    if count > existing:
+        print(f" in {time.perf_counter() - start:.0f}s")
+
+
+def legacy_save(db, filename, summary):
+    """The original save: insert pdf, insert summary, update pdf."""
+    pdf_id = db['pdfs'].insert_one({"filename": filename, "summary_id": None, "company_details": None}).inserted_id
+    summary_id = db['summaries'].insert_one({"pdf_id": pdf_id, "summary": summary}).inserted_id
+    db['pdfs'].update_one({"_id": pdf_id}, {"$set": {"summary_id": summary_id}})
+    return str(pdf_id), str(summary_id)
+
+
+def latencies(func, samples):
+    runs = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    runs.sort()
+    return {
+        "p50": statistics.median(runs) * 1000,
+        "p95": runs[int(len(runs) * 0.95) - 1 if len(runs) > 1 else 0] * 1000,
+        "max": runs[-1] * 1000,
+    }
+
+
+def report(name, result):
+    print(f"  {name:<34} p50 {result['p50']:8.2f} ms   p95 {result['p95']:8.2f} ms   max {result['max']:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=1_000_000, help="stored summaries to measure at")
+    parser.add_argument("--assets", type=int, default=2, help="assets per stored summary")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--scan-samples", type=int, default=5, help="gets timed without the pdf_id index")
+    parser.add_argument("--deep-pages", type=int, default=50, help="cursors followed for the deep listing page")
+    parser.add_argument("--db", default="digestadoc_bench", help="scratch database")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database for the next run")
+    args = parser.parse_args()
+
+    # app connects and creates its indexes in the scratch database
+    os.environ["MONGODB_DB"] = args.db
+    import app
+
+    if not app.mongo.wait_until_checked(timeout=30):
+        sys.exit("❌ No MongoDB at MONGODB_URI")
+    db, collection = app.db, app.summary_collection
+    try:
+        seed(collection, args.summaries, args.assets)
+        summary = make_summary(0, args.assets)
+        pdf_ids = [str(doc["pdf_id"]) for doc in collection.aggregate([
+            {"$sample": {"size": args.samples}}, {"$project": {"pdf_id": 1}},
+        ])]
+        print(f"📊 {collection.estimated_document_count()} summaries, {args.samples} samples")
+
+        report("save (single insert)", latencies(lambda: app.save_pdf_and_summary("bench.pdf", summary), args.samples))
+        report("save (legacy, 3 round trips)", latencies(lambda: legacy_save(db, "bench.pdf", summary), args.samples))
+        report("get by pdf_id (indexed)", latencies(lambda: app.get_summary_by_pdf_id(random.choice(pdf_ids)), args.samples))
+
+        cursor = None
+        for _ in range(args.deep_pages):
+            cursor = search_summaries(collection, {}, cursor)[1]
+        cin = summary["company_details"]["cin_number"]
+        report("list, first page", latencies(lambda: search_summaries(collection, {}), args.samples))
+        report(f"list, page {args.deep_pages + 1}", latencies(lambda: search_summaries(collection, {}, cursor), args.samples))
+        report("list, filtered by cin", latencies(lambda: search_summaries(collection, {"cin": cin}), args.samples))
+
+        collection.drop_index([("pdf_id", 1)])
+        try:
+            report("get by pdf_id (no index)",
+                   latencies(lambda: app.get_summary_by_pdf_id(random.choice(pdf_ids)), args.scan_samples))
+        finally:
+            app.ensure_indexes()
+    finally:
+        db['pdfs'].drop()
+        if not args.keep:
+            app.mongo_client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Latency of POST /process depending on where uploads are buffered: kept in
+memory (the default for reports under UPLOAD_SPOOL_MAX_BYTES), or spilled
+to a spool directory on tmpfs or on disk.
+
+Requests go through Flask's test client, so the measured time covers form
+parsing, buffering and extraction; the extraction cache is disabled and the
+pdfium backend is used by default so upload handling is not drowned out by
+layout analysis. MongoDB is not needed. Run from the backend directory:
+    python -m benchmarks.bench_upload_spooling --pages 10 50 --disk-dir /var/tmp
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+
+# Fail the import-time MongoDB ping fast when no server is running
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/digestadoc?serverSelectionTimeoutMS=200")
+
+import app as app_module
+from extraction_cache import extraction_cache
+from benchmarks.synthetic import write_report_pdf
+
+
+def spool_modes(disk_dir):
+    modes = {"memory": (app_module.UPLOAD_SPOOL_MAX_BYTES, None)}
+    if os.path.isdir("/dev/shm"):
+        modes["spill-tmpfs"] = (0, "/dev/shm")
+    modes["spill-disk"] = (0, disk_dir)
+    return modes
+
+
+def time_uploads(client, pdf_bytes, backend, repeat):
+    timings = []
+    for _ in range(repeat):
+        data = {"files[]": (io.BytesIO(pdf_bytes), "report.pdf", "application/pdf")}
+        start = time.perf_counter()
+        response = client.post(f"/process?backend={backend}", data=data, content_type="multipart/form-data")
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--backend", default="pdfium")
+    parser.add_argument("--disk-dir", default="/var/tmp", help="spool directory on a disk-backed filesystem")
+    args = parser.parse_args()
+
+    extraction_cache.max_entries = 0
+    client = app_module.app.test_client()
+    modes = spool_modes(args.disk_dir)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for pages in args.pages:
+            pdf_path = write_report_pdf(os.path.join(temp_dir, f"report_{pages}.pdf"), pages=pages, assets=max(1, pages // 10))
+            with open(pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+            time_uploads(client, pdf_bytes, args.backend, 1)  # warm up
+            row = []
+            for mode, (max_bytes, spool_dir) in modes.items():
+                app_module.UPLOAD_SPOOL_MAX_BYTES, app_module.UPLOAD_SPOOL_DIR = max_bytes, spool_dir
+                timings = time_uploads(client, pdf_bytes, args.backend, args.repeat)
+                row.append(f"{mode} {statistics.median(timings) * 1000:8.1f} ms")
+            print(f"{pages:>5} pages ({len(pdf_bytes) / 1024:7.0f} KiB) | " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
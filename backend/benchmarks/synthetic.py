@@ -0,0 +1,176 @@
+"""
+Synthetic CERSAI search reports for benchmarks.
+
+The layout mirrors the text pdfplumber extracts from a real CERSAI report:
+a search header, one block per security interest (borrowers, charge holder,
+asset details) and pages of legend / disclaimer boilerplate. PDFs can draw
+each borrower table as a ruled table with name and address cells, the way
+real reports do, instead of as plain text lines.
+"""
+import random
+
+DISCLAIMER_LINES = [
+    "Disclaimer",
+    "The information contained in this report is based on the records filed with",
+    "the Central Registry by the secured creditors. CERSAI does not verify the",
+    "correctness of the data filed and shall not be liable for any loss arising",
+    "out of the use of this report. Users are advised to verify the particulars",
+    "with the concerned secured creditor before entering into any transaction.",
+    "Legend: SI - Security Interest, QRF - Query Reference, NA - Not Applicable",
+]
+
+LOCALITIES = ["LOWER PAREL", "ANDHERI EAST", "BANDRA KURLA COMPLEX", "VASHI", "THANE WEST"]
+BANKS = ["STATE BANK OF INDIA", "HDFC BANK LIMITED", "BANK OF BARODA", "ICICI BANK LIMITED"]
+
+
+class BorrowerTable(list):
+    """Rows of a borrower table in a report page: drawn as a ruled table or as text lines."""
+
+    HEADER = ["Sr. No.", "Borrower Category", "Name & Address of the Borrower", "PAN", "Is Owner"]
+    TEXT_HEADER = "Sr. No. Borrower Category Name Of The Borrower PAN Is Owner"
+
+    def text_lines(self):
+        return [self.TEXT_HEADER] + [
+            f"{serial} {category} {name} {pan} {owner}" for serial, category, name, _, pan, owner in self
+        ]
+
+    def table_rows(self):
+        return [self.HEADER] + [
+            [serial, category.replace(" ", "\n", 1), f"{name}\n{address}", pan, owner]
+            for serial, category, name, address, pan, owner in self
+        ]
+
+
+def borrower_table(index, borrowers=1):
+    """Borrower rows of one security interest; the first borrower owns the asset."""
+    return BorrowerTable(
+        (str(b + 1), "Non-Individual Company", f"BORROWER {index}-{b} PRIVATE LIMITED",
+         f"{LOCALITIES[(index + b) % len(LOCALITIES)]}, MUMBAI, MAHARASHTRA, PIN: {400001 + (index + b) % 90}",
+         "NA", "Yes" if b == 0 else "No")
+        for b in range(borrowers)
+    )
+
+
+def _lines(items):
+    lines = []
+    for item in items:
+        lines += item.text_lines() if isinstance(item, BorrowerTable) else [item]
+    return lines
+
+
+def security_interest_block(index, borrowers=1, rng=None):
+    """Text of one security interest with its borrower table and asset details."""
+    return "\n".join(_lines(security_interest_items(index, borrowers, rng)))
+
+
+def security_interest_items(index, borrowers=1, rng=None):
+    """Lines of one security interest, with its borrower table as a `BorrowerTable`."""
+    rng = rng or random.Random(index)
+    si_id = 400010000000 + index
+    asset_id = 200010000000 + index
+    amount = rng.randrange(10_000_00, 500_000_000_00) / 100
+    locality = rng.choice(LOCALITIES)
+    lines = [
+        "Security Interest Details",
+        f"Security Interest ID {si_id}",
+        "Type Of Security Interest Mortgage by deposit of title deeds Type Of Finance Term Loan",
+        f"SI Creation Date In Bank {rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(2005, 2023)}",
+        f"Details Of Charge {'First' if index % 2 == 0 else 'Second'} Charge",
+        f"Total Secured Amount {amount:.2f}",
+        "Borrower Type Non-Individual Asset Category Immovable",
+        "Borrower(s) Details",
+        borrower_table(index, borrowers),
+    ]
+    lines += [
+        "Charge Holder Details",
+        "Charge Holder Name Office / Ward / Branch Name",
+        f"{rng.choice(BANKS)} {locality} BRANCH",
+        "Original View",
+        "Asset Details",
+        f"Asset ID {asset_id}",
+        f"Plot Number {rng.randint(1, 999)} Area {rng.randint(300, 9000)}.00",
+        "Area Unit Square Feet",
+        f"Survey Number / Municipal Number CS {rng.randint(1, 99)}/{rng.randint(100, 999)} Plot Details",
+        f"House / Flat Number / Unit No {rng.randint(101, 2404)} Floor No {rng.randint(1, 24)} Building Details",
+        f"Building / Tower Name / Number TOWER {chr(65 + index % 26)} Name Details",
+        "Name of the Project / Scheme / Society / Zone SUN PARADISE BUSINESS PLAZA Street Details",
+        "Street Name / Number SENAPATI BAPAT MARG Pocket NA",
+        f"Locality / Sector {locality} City / Town / Village MUMBAI District MUMBAI CITY",
+        "Landmark NEAR RAILWAY STATION Block Number NA Village NA",
+        "Taluka MUMBAI District MUMBAI CITY State MAHARASHTRA",
+        f"Pin Code / Post Code 4000{rng.randint(10, 99)}",
+        "State / UT MAHARASHTRA",
+        "Transaction History",
+    ]
+    return lines
+
+
+def make_report_items(pages=20, assets=1, borrowers=1, seed=0):
+    """Like `make_report_pages`, with each page a list of lines and `BorrowerTable`s."""
+    rng = random.Random(seed)
+    result = [
+        [
+            "CENTRAL REGISTRY OF SECURITISATION ASSET RECONSTRUCTION AND SECURITY INTEREST OF INDIA",
+            "Search Report",
+            f"Transaction ID / QRF NO {rng.randrange(10**11, 10**12)}",
+            "Search Criteria Debtor Name APRN ENTERPRISES PRIVATE LIMITED",
+        ]
+    ]
+    result += [security_interest_items(i, borrowers, random.Random(seed + i)) for i in range(assets)]
+    while len(result) < pages:
+        result.append(DISCLAIMER_LINES + [f"Page {len(result) + 1}"])
+    return result
+
+
+def make_report_pages(pages=20, assets=1, borrowers=1, seed=0):
+    """
+    Returns a list of page texts for a report with `assets` security interest
+    blocks, padded with boilerplate pages up to at least `pages` pages.
+    """
+    return ["\n".join(_lines(page)) for page in make_report_items(pages, assets, borrowers, seed)]
+
+
+def make_report_text(pages=20, assets=1, borrowers=1, seed=0):
+    """Report text joined the way `extract_data_from_pdf` joins pages."""
+    return "".join(page + "\n" for page in make_report_pages(pages, assets, borrowers, seed))
+
+
+def write_report_pdf(path, pages=20, assets=1, borrowers=1, seed=0, ruled_tables=False):
+    """
+    Renders a synthetic report to `path` as a PDF, one text page per report
+    page. With `ruled_tables` borrower tables are drawn as ruled tables whose
+    name cells also carry the borrower's address.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Table, TableStyle
+
+    pdf = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    style = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, "black"),
+        ("FONT", (0, 0), (-1, -1), "Helvetica", 7),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ])
+    for page in make_report_items(pages, assets, borrowers, seed):
+        y = height - 40
+        for item in page:
+            if isinstance(item, BorrowerTable) and ruled_tables:
+                table = Table(item.table_rows(), style=style)
+                _, table_height = table.wrapOn(pdf, width - 60, y)
+                if y - table_height < 40:
+                    pdf.showPage()
+                    y = height - 40
+                table.drawOn(pdf, 30, y - table_height + 8)
+                y -= table_height + 6
+                continue
+            for line in item.text_lines() if isinstance(item, BorrowerTable) else [item]:
+                if y < 40:
+                    pdf.showPage()
+                    y = height - 40
+                pdf.setFont("Helvetica", 8)
+                pdf.drawString(30, y, line)
+                y -= 12
+        pdf.showPage()
+    pdf.save()
+    return path
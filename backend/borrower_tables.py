@@ -0,0 +1,250 @@
+import os
+import re
+import pdfplumber
+from text_backends import is_file_like
+
+# --- Borrower Table Extraction ---
+# The borrower table of a security interest is read with pdfplumber's table
+# finder on just the region between its "Borrower(s) Details" heading and the
+# following holder heading, instead of regex-matching the report text. Tables
+# are read during the text pass, page by page, so each security interest's
+# borrowers are ready as soon as its block is; only the pages holding a
+# borrower table are laid out with pdfplumber.
+
+BORROWER_TABLES = os.getenv('BORROWER_TABLES', '1').lower() in ('1', 'true', 'yes')
+
+# Ruled tables first; tables drawn without lines fall back to word alignment
+TABLE_SETTINGS = (
+    {},
+    {"vertical_strategy": "text", "horizontal_strategy": "text"},
+)
+
+_YES_NO = {"yes": True, "no": False, "y": True, "n": False}
+
+def _cell(row, index):
+    if index is None or index >= len(row) or row[index] is None:
+        return ""
+    return row[index].strip()
+
+def _header_columns(row):
+    """Column indexes by role, or None if the row is not a borrower table header."""
+    columns = {}
+    for index, cell in enumerate(row):
+        label = (cell or "").lower().replace("\n", " ")
+        if not label:
+            continue
+        if "owner" in label:
+            columns.setdefault("owner", index)
+        elif "name" in label:
+            columns.setdefault("name", index)
+            if "address" in label:
+                columns["name_has_address"] = True
+        elif "address" in label:
+            columns.setdefault("address", index)
+        elif "state" in label:
+            columns.setdefault("state", index)
+        elif "pin" in label and "pan" not in label:
+            columns.setdefault("pin", index)
+        elif re.match(r"s(?:r|l)\.?\s*no", label):
+            columns.setdefault("serial", index)
+    if "name" not in columns or "owner" not in columns:
+        return None
+    return columns
+
+def parse_borrower_table(rows):
+    """
+    Borrowers from the rows of an extracted borrower table: a list of
+    {"name", "address", "is_owner"} dicts, or None when the rows do not look
+    like a borrower table (no header, or owner flags that are not Yes/No).
+
+    Rows without a serial number continue the previous borrower (cells that
+    wrapped onto another line).
+    """
+    rows = [row for row in rows or [] if row and any(cell for cell in row)]
+    for header_index, row in enumerate(rows):
+        columns = _header_columns(row)
+        if columns:
+            break
+    else:
+        return None
+
+    merged = []
+    for row in rows[header_index + 1:]:
+        serial = _cell(row, columns.get("serial"))
+        if merged and "serial" in columns and not serial:
+            merged[-1] = [
+                "\n".join(part for part in (previous, cell) if part)
+                for previous, cell in zip(merged[-1], (_cell(row, i) for i in range(len(merged[-1]))))
+            ]
+            continue
+        merged.append([_cell(row, i) for i in range(len(row))])
+
+    borrowers = []
+    for row in merged:
+        owner = _cell(row, columns["owner"]).lower()
+        if owner not in _YES_NO:
+            return None
+        name_lines = [line.strip() for line in _cell(row, columns["name"]).split("\n") if line.strip()]
+        if columns.get("name_has_address"):
+            name, address_parts = (name_lines[0] if name_lines else ""), name_lines[1:]
+        else:
+            name, address_parts = " ".join(name_lines), []
+        address_parts += [_cell(row, columns.get("address")).replace("\n", " ")]
+        state = _cell(row, columns.get("state")).replace("\n", " ")
+        pin = _cell(row, columns.get("pin"))
+        address_parts += [state, f"PIN: {pin}" if pin else ""]
+        borrowers.append({
+            "name": name or "-",
+            "address": ", ".join(part for part in address_parts if part),
+            "is_owner": _YES_NO[owner],
+        })
+    return borrowers or None
+
+def _heading_boxes(page, headings):
+    boxes = []
+    for heading in headings:
+        boxes += page.search(heading, regex=False, case=False, return_chars=False)
+    return sorted(boxes, key=lambda box: box["top"])
+
+def _page_regions(page, nth, heading, end_headings):
+    """
+    Cropped regions of `page` holding the nth `heading` on it and the borrower
+    table under it, down to the next end heading, and whether the table may
+    continue onto the top of the following page (no end heading below it).
+    None when the page has no nth heading.
+    """
+    starts = _heading_boxes(page, [heading])
+    if nth >= len(starts):
+        return None
+    # From the heading itself: the table's top rule can sit right on its baseline
+    top = starts[nth]["top"]
+    ends = [box["top"] for box in _heading_boxes(page, end_headings) if box["top"] > starts[nth]["bottom"]]
+    if ends:
+        return [page.crop((0, top, page.width, min(ends)))], False
+    return [page.crop((0, top, page.width, page.height))], True
+
+def _continuation_regions(page, end_headings):
+    """The top of `page` down to its first end heading, where a table from the previous page ends."""
+    ends = [box["top"] for box in _heading_boxes(page, end_headings)]
+    return [page.crop((0, 0, page.width, min(ends)))] if ends else []
+
+def _extract_rows(regions, table_settings):
+    rows = []
+    for region in regions:
+        table = region.extract_table(table_settings)
+        if table:
+            rows += table
+    return rows
+
+def _parse_rows(rows_by_settings):
+    for rows in rows_by_settings:
+        borrowers = parse_borrower_table(rows)
+        if borrowers:
+            return borrowers
+    return None
+
+class BorrowerTableReader:
+    """
+    Reads the borrower tables of one PDF during its text pass. The text
+    backend hands every page to `page_hook` while it is still open; pages
+    with a borrower heading get their tables read right there, from the
+    pdfplumber page the pdfplumber backend already laid out, or from a
+    pdfplumber document this reader opens on first need for the backends
+    that have none. Tables are numbered in heading order, as the headings
+    appear in the page texts; `table(index)` returns one once its page has
+    been through the hook.
+
+    A table running past the bottom of its page is completed from the top
+    of the next page, when that one comes through.
+    """
+
+    def __init__(self, pdf_source, heading, end_headings, max_tables=None):
+        self.pdf_source = pdf_source
+        self.heading = heading
+        self.end_headings = end_headings
+        self.max_tables = max_tables
+        self.tables = []      # parse_borrower_table borrowers (or None) per heading
+        self._pending = None  # (table index, rows per TABLE_SETTINGS) of a table continuing onto the next page
+        self._pdf = None
+
+    def page_hook(self, page_index, page, page_text):
+        """Reads the tables on one page. `page` is its open pdfplumber page, or None."""
+        count = page_text.lower().count(self.heading.lower()) if page_text else 0
+        if self.max_tables is not None:
+            count = min(count, self.max_tables - len(self.tables))
+        if not count and self._pending is None:
+            return
+        own_page = page is None
+        if own_page:
+            page = self._page(page_index)
+        try:
+            if self._pending is not None:
+                self._continue_pending(page)
+            for nth in range(count):
+                self._read_table(page, nth)
+        finally:
+            if own_page and page is not None:
+                page.close()
+
+    def table(self, index):
+        """Borrowers of the index-th table, or None when it was not (or could not be) read."""
+        if self._pending is not None and self._pending[0] == index:
+            # Its block ended on this page after all
+            self._finish_pending()
+        return self.tables[index] if index < len(self.tables) else None
+
+    def _page(self, page_index):
+        if self._pdf is None:
+            if is_file_like(self.pdf_source):
+                self.pdf_source.seek(0)
+            self._pdf = pdfplumber.open(self.pdf_source)
+        return self._pdf.pages[page_index] if page_index < len(self._pdf.pages) else None
+
+    def _read_table(self, page, nth):
+        self._finish_pending()
+        index = len(self.tables)
+        self.tables.append(None)
+        if page is None:
+            return
+        try:
+            found = _page_regions(page, nth, self.heading, self.end_headings)
+            if found is None:
+                return
+            regions, continues = found
+            if not continues:
+                for table_settings in TABLE_SETTINGS:
+                    borrowers = parse_borrower_table(_extract_rows(regions, table_settings))
+                    if borrowers:
+                        self.tables[index] = borrowers
+                        break
+                return
+            # Every strategy's rows now, while the page is laid out
+            self._pending = (index, [_extract_rows(regions, table_settings) for table_settings in TABLE_SETTINGS])
+        except Exception as e:
+            print(f"Borrower table on page {page.page_number} could not be read: {e}")
+
+    def _continue_pending(self, page):
+        index, rows_by_settings = self._pending
+        try:
+            if page is not None:
+                regions = _continuation_regions(page, self.end_headings)
+                rows_by_settings = [
+                    rows + _extract_rows(regions, table_settings)
+                    for rows, table_settings in zip(rows_by_settings, TABLE_SETTINGS)
+                ]
+        except Exception as e:
+            print(f"Borrower table continued on page {page.page_number} could not be read: {e}")
+        self._pending = (index, rows_by_settings)
+        self._finish_pending()
+
+    def _finish_pending(self):
+        if self._pending is not None:
+            index, rows_by_settings = self._pending
+            self._pending = None
+            self.tables[index] = _parse_rows(rows_by_settings)
+
+    def close(self):
+        self._finish_pending()
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
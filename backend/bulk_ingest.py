@@ -0,0 +1,144 @@
+"""
+Bulk ingestion of CERSAI PDFs from a directory tree.
+
+Walks the directory, extracts every PDF on a process pool and appends one
+JSON line per file to the output, each holding the same summary /process
+returns for that file. Optionally saves the summaries to MongoDB as well,
+exactly as /save_summaries stores uploads.
+
+Finished files are recorded in a checkpoint file once their results are
+written, so an interrupted run picks up where it stopped when started again
+with the same arguments. Run from the backend directory:
+    python bulk_ingest.py /data/cersai --output reports.jsonl --mongo
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from extraction_utils import iter_file_reports, report_summary, EXTRACTION_WORKERS, EXTRACTION_FILE_TIMEOUT
+from text_backends import text_backends
+from summary_utils import save_summaries
+
+
+def iter_pdf_files(root):
+    """Relative paths of every .pdf under root, in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith('.pdf'):
+                yield os.path.relpath(os.path.join(dirpath, filename), root)
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+def connect_mongo():
+    import pymongo
+
+    load_dotenv()
+    client = pymongo.MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/digestadoc'))
+    client.admin.command('ping')
+    return client[os.getenv('MONGODB_DB', 'digestadoc')]
+
+
+class Throughput:
+    """Running files/s and pages/s since the run started."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.files = 0
+        self.pages = 0
+        self.failed = 0
+
+    def add(self, report):
+        self.files += 1
+        self.pages += report.get("pages", 0)
+        self.failed += report["error"] is not None
+
+    def line(self, total, skipped):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"{skipped + self.files}/{total} files ({self.failed} failed) | "
+                f"{self.files / elapsed:.2f} files/s | {self.pages / elapsed:.1f} pages/s")
+
+
+def ingest_batch(root, batch, args, company_details, db):
+    """
+    Extracts one batch of files and returns (relative path, report, summary)
+    in input order, leaving out files whose summary could not be saved to `db`.
+    """
+    paths = [os.path.join(root, rel_path) for rel_path in batch]
+    results = [None] * len(batch)
+    for index, report in iter_file_reports(paths, args.backend, args.workers, args.timeout, use_cache=False):
+        results[index] = (batch[index], report, report_summary(paths[index], report, company_details))
+
+    if db is not None:
+        saved = save_summaries(db['summaries'], db['summary_assets'], [
+            {"filename": os.path.basename(rel_path), "summary": summary, "companyDetails": company_details}
+            for rel_path, _, summary in results
+        ])
+        for (rel_path, _, _), result in zip(results, saved):
+            if 'error' in result:
+                print(f"❌ {rel_path} not saved to MongoDB: {result['error']}")
+        # Left out of the output and checkpoint, so the next run retries them
+        results = [entry for entry, result in zip(results, saved) if 'error' not in result]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="directory to walk for .pdf files")
+    parser.add_argument("--output", default="reports.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--checkpoint", help="finished-files list (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=EXTRACTION_WORKERS)
+    parser.add_argument("--timeout", type=float, default=EXTRACTION_FILE_TIMEOUT, help="seconds allowed per file")
+    parser.add_argument("--batch-size", type=int, default=64, help="files extracted and checkpointed together")
+    parser.add_argument("--backend", choices=list(text_backends), help="PDF text backend (default: PDF_TEXT_BACKEND)")
+    parser.add_argument("--company-details", help="JSON file with the company form applied to every report")
+    parser.add_argument("--mongo", action="store_true", help="also save summaries to MongoDB (MONGODB_URI)")
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint"
+    company_details = None
+    if args.company_details:
+        with open(args.company_details, encoding='utf-8') as f:
+            company_details = json.load(f)
+
+    done = load_checkpoint(checkpoint_path)
+    files = list(iter_pdf_files(args.root))
+    todo = [rel_path for rel_path in files if rel_path not in done]
+    skipped = len(files) - len(todo)
+    print(f"📂 {len(files)} PDF file(s) under {args.root}, {skipped} already done, {len(todo)} to go")
+    if not todo:
+        return
+
+    db = connect_mongo() if args.mongo else None
+    throughput = Throughput()
+    with open(args.output, "a", encoding="utf-8") as output, open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        try:
+            for start in range(0, len(todo), args.batch_size):
+                results = ingest_batch(args.root, todo[start:start + args.batch_size], args, company_details, db)
+                # Results are made durable before the files are checkpointed
+                for rel_path, report, summary in results:
+                    output.write(json.dumps({"file": rel_path, **summary}) + "\n")
+                    throughput.add(report)
+                output.flush()
+                os.fsync(output.fileno())
+                checkpoint.writelines(rel_path + "\n" for rel_path, _, _ in results)
+                checkpoint.flush()
+                print(f"⏱️  {throughput.line(len(files), skipped)}", flush=True)
+        except KeyboardInterrupt:
+            print("\n⚠️  Interrupted; run the same command again to resume")
+            sys.exit(130)
+    print(f"✅ Done: {throughput.line(len(files), skipped)}")
+
+
+if __name__ == "__main__":
+    main()
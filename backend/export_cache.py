@@ -0,0 +1,238 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from export_utils import EXPORTER_VERSION
+
+# --- Rendered Export Cache ---
+# Rendered exports (HTML, Excel, PDF) are cached under (pdf_id, format,
+# summary version, exporter version), so a repeated download is a file read
+# instead of a Mongo read and a render. Files live in EXPORT_CACHE_DIR, kept
+# under EXPORT_CACHE_MAX_BYTES by evicting the least recently used; with
+# EXPORT_CACHE_GRIDFS they are also stored in GridFS, which every worker and
+# host shares and which refills the local directory after a restart or
+# eviction. Re-saving a summary bumps its version, so older renders are never
+# served again; `invalidate` also deletes them to free the space.
+
+EXPORT_CACHE_DIR = os.getenv('EXPORT_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export_cache'))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv('EXPORT_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+class ExportCache:
+    """
+    Size-capped on-disk LRU of rendered exports, with an optional GridFS
+    bucket as the second tier.
+    """
+
+    def __init__(self, exporter_version, directory=EXPORT_CACHE_DIR, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        self.exporter_version = exporter_version
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bucket = None
+        self.hits = 0
+        self.misses = 0
+        self.gridfs_hits = 0
+        self._entries = OrderedDict()  # file name -> size in bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def disk_enabled(self):
+        return bool(self.directory) and self.max_bytes > 0
+
+    @property
+    def enabled(self):
+        return self.disk_enabled or self.bucket is not None
+
+    def attach_gridfs(self, db, bucket_name='export_cache'):
+        """Adds a GridFS bucket in `db` as the second tier."""
+        import gridfs
+
+        db[f'{bucket_name}.files'].create_index('metadata.pdf_id')
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket_name)
+
+    def file_name(self, pdf_id, format, summary_version):
+        # pdf_id first, so a summary's renders are found by prefix
+        exporter = hashlib.blake2b(str(self.exporter_version).encode(), digest_size=4).hexdigest()
+        return f"{pdf_id}.{summary_version}.{exporter}.{format}"
+
+    def _load(self):
+        # Files left by earlier runs (and other workers), oldest use first
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.disk_enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._bytes += size
+        for name in self._evict():
+            self._remove_file(name)
+
+    def get(self, pdf_id, format, summary_version):
+        """The cached export, or None."""
+        if not self.enabled:
+            return None
+        name = self.file_name(pdf_id, format, summary_version)
+        data = self._read_disk(name)
+        if data is None and self.bucket is not None:
+            data = self._read_gridfs(name)
+            if data is not None:
+                self._write_disk(name, data)
+                with self._lock:
+                    self.gridfs_hits += 1
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, pdf_id, format, summary_version, data):
+        if not self.enabled:
+            return
+        name = self.file_name(pdf_id, format, summary_version)
+        self._write_disk(name, data)
+        if self.bucket is not None:
+            try:
+                for old in self.bucket.find({'filename': name}):
+                    self.bucket.delete(old._id)
+                self.bucket.upload_from_stream(name, data, metadata={'pdf_id': str(pdf_id)})
+            except Exception as e:
+                print(f"Export cache store in GridFS failed: {e}")
+
+    def invalidate(self, pdf_id):
+        """Deletes every cached render of `pdf_id`."""
+        prefix = f"{pdf_id}."
+        if self.disk_enabled:
+            with self._lock:
+                self._load()
+                names = [name for name in self._entries if name.startswith(prefix)]
+                for name in names:
+                    self._bytes -= self._entries.pop(name)
+            # Also renders written by other workers since this one loaded
+            try:
+                names += [name for name in os.listdir(self.directory) if name.startswith(prefix)]
+            except OSError:
+                pass
+            for name in set(names):
+                self._remove_file(name)
+        if self.bucket is not None:
+            try:
+                for old in self.bucket.find({'metadata.pdf_id': str(pdf_id)}):
+                    self.bucket.delete(old._id)
+            except Exception as e:
+                print(f"Export cache invalidation in GridFS failed: {e}")
+
+    def _read_disk(self, name):
+        if not self.disk_enabled:
+            return None
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            self._load()
+            known = name in self._entries
+            if known:
+                self._entries.move_to_end(name)
+        if not known:
+            # Rendered by another worker since this one loaded?
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return None
+            with self._lock:
+                self._bytes += size - self._entries.get(name, 0)
+                self._entries[name] = size
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Recency survives restarts through the file's mtime
+            os.utime(path)
+        except OSError:
+            # Evicted by another worker
+            with self._lock:
+                size = self._entries.pop(name, None)
+                if size is not None:
+                    self._bytes -= size
+            return None
+        return data
+
+    def _read_gridfs(self, name):
+        import gridfs
+
+        try:
+            return self.bucket.open_download_stream_by_name(name).read()
+        except gridfs.errors.NoFile:
+            return None
+        except Exception as e:
+            print(f"Export cache lookup in GridFS failed: {e}")
+            return None
+
+    def _write_disk(self, name, data):
+        if not self.disk_enabled or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Export cache could not write {path}: {e}")
+            return
+        with self._lock:
+            self._bytes += len(data) - self._entries.get(name, 0)
+            self._entries[name] = len(data)
+            self._entries.move_to_end(name)
+            evicted = self._evict()
+        for old in evicted:
+            self._remove_file(old)
+
+    def _evict(self):
+        """Drops least recently used entries until under max_bytes; returns their file names (lock held)."""
+        evicted = []
+        while self._bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            evicted.append(name)
+        return evicted
+
+    def _remove_file(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "gridfs_hits": self.gridfs_hits,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "gridfs": self.bucket is not None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            names = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.gridfs_hits = 0
+        for name in names:
+            self._remove_file(name)
+
+# Create a global instance
+export_cache = ExportCache(EXPORTER_VERSION)
@@ -0,0 +1,148 @@
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from export_utils import export_utils, EXPORT_FORMATS
+from export_cache import export_cache
+from metrics_utils import export_render_seconds, export_render_queue_depth, export_renders_total, export_render_waits_total
+
+# --- Export Pre-rendering ---
+# Users download the PDF and Excel right after saving, so a save queues
+# renders of EXPORT_PRERENDER_FORMATS on a small thread pool, from the
+# summary it just stored; the results go to the export cache. Every render,
+# queued or requested by /export, is registered by (pdf_id, format, summary
+# version) while in progress, and a request for one already in progress
+# waits for it (up to EXPORT_RENDER_WAIT seconds) instead of rendering the
+# same export twice.
+
+EXPORT_PRERENDER_FORMATS = [
+    format.strip() for format in os.getenv('EXPORT_PRERENDER_FORMATS', 'pdf,excel').split(',')
+    if format.strip() in EXPORT_FORMATS
+]
+EXPORT_RENDER_WORKERS = int(os.getenv('EXPORT_RENDER_WORKERS', '2'))
+EXPORT_RENDER_WAIT = float(os.getenv('EXPORT_RENDER_WAIT', '120'))
+
+class RenderPending(Exception):
+    """An export was still rendering after EXPORT_RENDER_WAIT seconds."""
+
+class ExportRenderer:
+    """Renders exports into the export cache, at most once at a time per (pdf_id, format, version)."""
+
+    def __init__(self, cache, max_workers=EXPORT_RENDER_WORKERS, formats=None):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.formats = EXPORT_PRERENDER_FORMATS if formats is None else formats
+        self.queued = 0
+        self.running = 0
+        self.rendered = 0
+        self.failed = 0
+        self.waits = 0
+        self.render_seconds = 0.0
+        self._in_progress = {}  # (pdf_id, format, version) -> Future of the rendered bytes
+        self._executor = None
+        self._lock = threading.Lock()
+        export_render_queue_depth.set(0)
+
+    def prerender(self, pdf_id, version, summary):
+        """Queues background renders of the configured formats of a just-saved summary."""
+        if self.max_workers <= 0 or not self.cache.enabled:
+            return
+        for format in self.formats:
+            key = (str(pdf_id), format, version)
+            with self._lock:
+                if key in self._in_progress:
+                    continue
+                future = self._in_progress[key] = Future()
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="export")
+                self.queued += 1
+            export_render_queue_depth.inc()
+            self._executor.submit(self._run_queued, key, summary, future)
+
+    def _run_queued(self, key, summary, future):
+        with self._lock:
+            self.queued -= 1
+        export_render_queue_depth.dec()
+        self._render(key, summary, future, mode="background")
+
+    def render(self, pdf_id, format, version, load_summary):
+        """
+        The export, rendered now or by a render of it already in progress.
+        `load_summary()` returns (summary, version) and is only called when
+        this request renders; returns None when the summary is gone.
+        """
+        key = (str(pdf_id), format, version)
+        with self._lock:
+            future = self._in_progress.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_progress[key] = Future()
+            else:
+                self.waits += 1
+        if not owner:
+            export_render_waits_total.inc(format=format)
+            try:
+                return future.result(timeout=EXPORT_RENDER_WAIT)
+            except FutureTimeoutError:
+                raise RenderPending(f"{format} export of {pdf_id} is still rendering")
+        try:
+            summary, loaded_version = load_summary()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        if summary is None:
+            self._finish(key, future, result=None)
+            return None
+        # Re-saved since the version was read: cache under the one rendered
+        return self._render(key, summary, future, mode="request", version=loaded_version)
+
+    def _render(self, key, summary, future, mode, version=None):
+        pdf_id, format, _ = key
+        with self._lock:
+            self.running += 1
+        start = time.perf_counter()
+        try:
+            with export_render_seconds.time(format=format):
+                data = export_utils.render(summary, format)
+        except Exception as e:
+            with self._lock:
+                self.running -= 1
+                self.failed += 1
+            export_renders_total.inc(format=format, mode=mode, status="failed")
+            print(f"❌ Rendering {format} export of {pdf_id} failed: {e}")
+            self._finish(key, future, error=e)
+            if mode == "request":
+                raise
+            return None
+        with self._lock:
+            self.running -= 1
+            self.rendered += 1
+            self.render_seconds += time.perf_counter() - start
+        export_renders_total.inc(format=format, mode=mode, status="ok")
+        self.cache.put(pdf_id, format, version if version is not None else key[2], data)
+        self._finish(key, future, result=data)
+        return data
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._in_progress.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "formats": list(self.formats),
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "rendered": self.rendered,
+                "failed": self.failed,
+                "waits": self.waits,
+                "average_render_seconds": round(self.render_seconds / self.rendered, 3) if self.rendered else 0.0,
+            }
+
+# Create a global instance
+export_renderer = ExportRenderer(export_cache)
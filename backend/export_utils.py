@@ -10,6 +10,17 @@ import io
 import tempfile
 import os
 
+# Part of every rendered-export cache key: bump it whenever a change to the
+# templates or renderers changes what an export looks like.
+EXPORTER_VERSION = "1"
+
+# Export format -> (Content-Type, file extension of the download)
+EXPORT_FORMATS = {
+    'html': ('text/html', None),
+    'excel': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
 class ExportUtils:
     def __init__(self):
         self.html_template = """
@@ -735,6 +746,24 @@ class ExportUtils:
         
         doc.build(story)
 
+    def render(self, json_data, format):
+        """The bytes of `json_data` exported as one of EXPORT_FORMATS."""
+        if format == 'html':
+            return self.json_to_html(json_data).encode('utf-8')
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{format}'")
+        output_path = tempfile.mktemp(suffix=f'.{EXPORT_FORMATS[format][1]}')
+        try:
+            if format == 'excel':
+                self.json_to_excel(json_data, output_path)
+            else:
+                self.json_to_pdf(json_data, output_path)
+            with open(output_path, 'rb') as f:
+                return f.read()
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
 # Create a global instance
 export_utils = ExportUtils()
 
@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# --- Extraction Cache ---
+# Caches the PDF-derived part of an extraction (search reference id and asset
+# records, never company details) under the SHA-256 of the PDF bytes, the
+# extractor version and the text backend, so re-uploading the same report
+# skips parsing entirely.
+
+EXTRACTION_CACHE_SIZE = int(os.getenv('EXTRACTION_CACHE_SIZE', '256'))
+EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', str(7 * 24 * 3600)))
+
+def file_sha256(pdf_source, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a PDF's bytes, from a path or a seekable binary file object."""
+    digest = hashlib.sha256()
+    if hasattr(pdf_source, 'read'):
+        pdf_source.seek(0)
+        for chunk in iter(lambda: pdf_source.read(chunk_size), b''):
+            digest.update(chunk)
+        pdf_source.seek(0)
+        return digest.hexdigest()
+    with open(pdf_source, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    Two-tier cache: an in-process LRU in front of an optional MongoDB
+    collection with a TTL index. Entries are stored as JSON so every hit
+    returns fresh objects the caller is free to modify.
+    """
+
+    def __init__(self, max_entries=EXTRACTION_CACHE_SIZE, ttl_seconds=EXTRACTION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attach_mongo(self, collection):
+        """Adds a MongoDB collection as the second tier; entries expire after ttl_seconds."""
+        collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+        self.collection = collection
+
+    def key_for(self, pdf_source, version, backend):
+        """Cache key for a PDF path or file object, or None when it cannot be read."""
+        try:
+            return f"{file_sha256(pdf_source)}:{version}:{backend}"
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key):
+        if key is None or self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.collection is not None:
+            try:
+                doc = self.collection.find_one({"_id": key}, {"report": 1})
+            except Exception as e:
+                print(f"Extraction cache lookup failed: {e}")
+                doc = None
+            if doc:
+                entry = doc["report"]
+                self._remember(key, entry)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry)
+
+    def put(self, key, report):
+        if key is None or self.max_entries <= 0:
+            return
+        entry = json.dumps(report)
+        self._remember(key, entry)
+        if self.collection is not None:
+            try:
+                self.collection.replace_one(
+                    {"_id": key},
+                    {"_id": key, "report": entry, "created_at": datetime.now(timezone.utc)},
+                    upsert=True,
+                )
+            except Exception as e:
+                print(f"Extraction cache store failed: {e}")
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+# Create a global instance
+extraction_cache = ExtractionCache()
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field, fields
+
+# --- Extraction Records ---
+# Slotted records for extracted assets. They are what extraction produces,
+# pool workers send back and bulk runs hold in memory; `to_dict()` turns them
+# into the JSON shape /process has always returned (same keys, same order)
+# only where results leave the pipeline.
+
+def _slotted(cls):
+    """
+    Rebuilds a dataclass with `__slots__` for its fields, as
+    `@dataclass(slots=True)` does on Python 3.10+. Field defaults already
+    live in the generated `__init__`, so the class attributes holding them
+    (which would clash with the slots) are dropped.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+@_slotted
+@dataclass
+class AssetDetails:
+    """Fields of `asset_field_map`, in the same order."""
+    asset_id: str = "-"
+    plot_id: str = "-"
+    survey_no: str = "-"
+    house_id: str = "-"
+    floor_no: str = "-"
+    building_no: str = "-"
+    building_name: str = "-"
+    buildup_area: str = "-"
+    street_name: str = "-"
+    sector_ward_no: str = "-"
+    locality: str = "-"
+    landmark: str = "-"
+    block_no: str = "-"
+    village: str = "-"
+    town: str = "-"
+    taluka: str = "-"
+    district: str = "-"
+    pin_code: str = "-"
+    state: str = "-"
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in _ASSET_DETAILS_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+@_slotted
+@dataclass
+class SecurityInterest:
+    """Fields of `security_field_map` followed by the ones derived from them."""
+    security_interest_id: str = "-"
+    security_interest_type: str = "-"
+    si_creation_date: str = "-"
+    charge_holder_name: str = "-"
+    charge_amount: str = "-"
+    borrower_type: str = "-"
+    details_of_charge: str = "-"
+    charge_holder_name_amount: str = "-"
+    borrowers: str = "-"
+    sub_borrower: str = "-"
+    third_party_mortgagees: str = "-"
+    borrower_details: list = field(default_factory=list)
+    is_asset_under_charge: str = "No"
+    charge_release_date: str = "N/A"
+
+    def to_dict(self):
+        data = {}
+        for name in _SECURITY_INTEREST_FIELDS:
+            value = getattr(self, name)
+            data[_SECURITY_INTEREST_KEYS.get(name, name)] = (
+                [dict(borrower) for borrower in value] if name == "borrower_details" else value
+            )
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{_SECURITY_INTEREST_NAMES.get(key, key): value for key, value in data.items()})
+
+@_slotted
+@dataclass
+class AssetRecord:
+    """One security interest of a report: its asset and the interest itself."""
+    asset_details: AssetDetails
+    security_interest: SecurityInterest
+
+    def to_dict(self):
+        return {
+            "asset_details_of_security_interest": self.asset_details.to_dict(),
+            "security_interest_details": self.security_interest.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            AssetDetails.from_dict(data["asset_details_of_security_interest"]),
+            SecurityInterest.from_dict(data["security_interest_details"]),
+        )
+
+_ASSET_DETAILS_FIELDS = tuple(f.name for f in fields(AssetDetails))
+_SECURITY_INTEREST_FIELDS = tuple(f.name for f in fields(SecurityInterest))
+# JSON keys that are not valid attribute names
+_SECURITY_INTEREST_KEYS = {"is_asset_under_charge": "Is assetUnder Charge?/ Ranking of Charge"}
+_SECURITY_INTEREST_NAMES = {key: name for name, key in _SECURITY_INTEREST_KEYS.items()}
@@ -0,0 +1,885 @@
+import re
+import io
+import os
+import time
+import atexit
+from decimal import Decimal, InvalidOperation
+from text_backends import get_text_backend, is_file_like, DEFAULT_TEXT_BACKEND
+from extraction_cache import extraction_cache
+from borrower_tables import BorrowerTableReader, BORROWER_TABLES
+from extraction_records import AssetDetails, SecurityInterest, AssetRecord
+from metrics_utils import metrics, record_extraction
+from page_cache import PageFingerprintCache
+from worker_pool import WorkerPool
+
+# Bump whenever a change to extraction alters its output, so cached results are not reused
+EXTRACTOR_VERSION = "4"
+
+# Parallel extraction settings for process_cersai_reports
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', min(4, os.cpu_count() or 1)))
+EXTRACTION_FILE_TIMEOUT = float(os.getenv('EXTRACTION_FILE_TIMEOUT', '300'))
+
+# Limits that keep malformed reports from pinning a worker. A field pattern
+# only matches within FIELD_WINDOW_CHARS of its label, and a document still
+# being extracted after EXTRACTION_TIME_BUDGET seconds (0 = no budget) returns
+# the records read so far, marked as truncated. The budget is meant to run out
+# before EXTRACTION_FILE_TIMEOUT, which discards everything.
+FIELD_WINDOW_CHARS = int(os.getenv('FIELD_WINDOW_CHARS', '2000'))
+EXTRACTION_TIME_BUDGET = float(os.getenv('EXTRACTION_TIME_BUDGET', '120'))
+
+# --- Your Corrected and Integrated PDF Parsing Logic ---
+
+FIELD_FLAGS = re.DOTALL | re.IGNORECASE
+
+class TimeBudgetExceeded(Exception):
+    """Raised when a document's extraction runs past its time budget."""
+
+def check_deadline(deadline):
+    """Raises TimeBudgetExceeded once `time.monotonic()` has passed `deadline` (None = no deadline)."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeBudgetExceeded("Extraction time budget exceeded")
+
+def safe_get_value(text_blob, pattern, group=1, default="-"):
+    """
+    Safely extracts a value from a text blob using a regex pattern.
+    Returns the found group or a default value if not found.
+    """
+    try:
+        match = re.search(pattern, text_blob, FIELD_FLAGS)
+        if match and group <= len(match.groups()):
+            # Ensure the matched group is not None before stripping
+            value = match.group(group)
+            return value.strip().replace('\n', ' ') if value else default
+    except IndexError:
+        print(f"Warning: Group {group} does not exist for pattern: {pattern}")
+    return default
+
+def convert_to_lakhs(amount_str):
+    """
+    Converts a string amount to a formatted string in Lakhs.
+    Example: "374400000.00" -> "3744.00 Lakhs"
+    """
+    if not amount_str or amount_str == '-':
+        return "0.00 Lakhs"
+    try:
+        amount = Decimal(amount_str)
+        lakhs = amount / Decimal('100000')
+        return f"{lakhs:.2f} Lakhs"
+    except (InvalidOperation, TypeError):
+        return "0.00 Lakhs"
+
+# --- Asset and Security Field Maps (from user logic) ---
+asset_field_map = {
+    "asset_id": r"Asset ID\s*([0-9]+)",
+    "plot_id": r"Plot Number\s*([^\n\r]+?)(?:\s+Area|\n|$)",
+    "survey_no": r"Survey Number\s*/\s*Municipal Number\s*([^\n\r]+?)(?:\s+Plot|\n|$)",
+    "house_id": r"House\s*/\s*Flat Number\s*/\s*Unit No\s*([^\n\r]+?)(?:\s+Floor|\n|$)",
+    "floor_no": r"Floor No\s*([^\n\r]+?)(?:\s+Building|\n|$)",
+    "building_no": r"Building\s*/\s*Tower Name\s*/\s*Number\s*([^\n\r]+?)(?:\s+Name|\n|$)",
+    "building_name": r"Name of the Project\s*/\s*Scheme\s*/\s*Society\s*/\s*Zone\s*([^\n\r]+?)(?:\s+Street|\n|$)",
+    "buildup_area": r"Area\s*([0-9.]+)",
+    "street_name": r"Street Name\s*/\s*Number\s*([^\n\r]+?)(?:\s+Pocket|\n|$)",
+    "sector_ward_no": r"Locality\s*/\s*Sector\s*([^\n\r]+?)(?:\s+City|\n|$)",
+    "locality": r"Locality\s*/\s*Sector\s*([^\n\r]+?)(?:\s+City|\n|$)",
+    "landmark": r"Landmark\s*([^\n\r]+?)(?:\s+Block|\n|$)",
+    "block_no": r"Block Number\s*([^\n\r]+?)(?:\s+Village|\n|$)",
+    "village": r"City\s*/\s*Town\s*/\s*Village\s*([^\n\r]+?)(?:\s+District|\n|$)",
+    "town": r"City\s*/\s*Town\s*/\s*Village\s*([^\n\r]+?)(?:\s+District|\n|$)",
+    "taluka": r"Taluka\s*([^\n\r]+?)(?:\s+District|\n|$)",
+    "district": r"District\s*([^\n\r]+?)(?:\s+State|\n|$)",
+    "pin_code": r"Pin Code\s*/\s*Post Code\s*([0-9]+)",
+    "state": r"State\s*/\s*UT\s*([^\n\r]+)",
+}
+
+security_field_map = {
+    "security_interest_id": r"Security Interest ID\s*([0-9]+)",
+    "security_interest_type": r"Type Of Security Interest\s*([^\n\r]+?)(?:\s+Type Of Finance|\s+Details Of Charge|\n|$)",
+    "si_creation_date": r"SI Creation Date In Bank\s*([0-9\-]+)",
+    "charge_holder_name": r"Charge Holder Name\s+Office / Ward / Branch Name\s*(.*?)\s*(?:Original View|Transaction History)",
+    "charge_amount": r"Total Secured Amount\s*([0-9.]+)",
+    "borrower_type": r"Borrower Type\s*([^\n\r]+?)(?:\s+Asset Category|\s+Name of the Debtor|\n|$)",
+    "details_of_charge": r"Details Of Charge\s*([^\n\r]+)",
+}
+
+# Patterns used outside the two field maps when building the final record
+report_field_map = {
+    "area_unit": r"Area Unit\s*(\w+\s*\w+)",
+    "details_of_charge": r"Details Of Charge\s*([^\n\r]+)",
+    "search_reference_id": r"Transaction ID / QRF NO\s*([0-9]+)",
+}
+
+# --- Report Sections ---
+# Headings that start each section of a CERSAI report, matched case-insensitively.
+# A section runs from its heading to the next heading of any kind (or the end of the text).
+section_headings = {
+    "security_interest": ["Security Interest Details"],
+    "borrowers": ["Borrower(s) Details"],
+    "holder": ["Charge Holder Details", "Holder Details"],
+    "asset": ["Asset Details"],
+}
+
+# Section each field is read from. A field that does not match in its section
+# is left empty rather than taken from another one; fields not listed here,
+# or whose section heading does not appear in a report at all, are searched
+# in the whole text.
+field_sections = {
+    "asset": dict.fromkeys(asset_field_map, "asset"),
+    "security": {
+        "security_interest_id": "security_interest",
+        "security_interest_type": "security_interest",
+        "si_creation_date": "security_interest",
+        "charge_holder_name": "holder",
+        "charge_amount": "security_interest",
+        "details_of_charge": "security_interest",
+    },
+    "report": {
+        "area_unit": "asset",
+        "details_of_charge": "security_interest",
+    },
+}
+
+class SectionIndex:
+    """
+    Offsets of every section heading in one report's text, found once per
+    document so each field can be matched against its own section only.
+    """
+
+    _HEADINGS_RE = re.compile(
+        "|".join(
+            f"(?P<{name}>{'|'.join(re.escape(heading) for heading in headings)})"
+            for name, headings in section_headings.items()
+        ),
+        re.IGNORECASE,
+    )
+
+    def __init__(self, text, start=0, end=None):
+        self.start = start
+        self.end = len(text) if end is None else end
+        # (offset, section name) for every heading, in document order
+        self.headings = self._find_headings(text)
+        bounds = [offset for offset, _ in self.headings[1:]] + [self.end]
+        self._spans = {}
+        for (offset, section), bound in zip(self.headings, bounds):
+            self._spans.setdefault(section, []).append((offset, bound))
+
+    def _find_headings(self, text):
+        if not text.isascii():
+            # Case folding non-ASCII text can shift offsets; fall back to the regex
+            return [
+                (match.start(), match.lastgroup)
+                for match in self._HEADINGS_RE.finditer(text, self.start, self.end)
+            ]
+        lowered = text[self.start:self.end].lower()
+        found = []
+        for name, headings in section_headings.items():
+            for heading in headings:
+                heading = heading.lower()
+                offset = lowered.find(heading)
+                while offset != -1:
+                    found.append((self.start + offset, self.start + offset + len(heading), name))
+                    offset = lowered.find(heading, offset + 1)
+        # Drop headings nested in a longer one ("Holder Details" in "Charge Holder Details")
+        headings = []
+        covered = -1
+        for offset, end, name in sorted(found, key=lambda item: (item[0], -item[1])):
+            if offset >= covered:
+                headings.append((offset, name))
+                covered = end
+        return headings
+
+    def spans(self, name):
+        """All (start, end) offsets of the named section, in document order."""
+        return self._spans.get(name, [])
+
+    def span(self, name):
+        """(start, end) of the first occurrence of the named section, or None."""
+        spans = self._spans.get(name)
+        return spans[0] if spans else None
+
+class FieldExtractor:
+    """
+    Runs a fixed set of field patterns against report text.
+
+    Every distinct pattern is compiled once, up front, with the same flags
+    `safe_get_value` uses, and fields sharing a pattern are matched once.
+    Each pattern starts with a literal label (e.g. "Asset ID"): a fast
+    substring scan finds where that label first appears, patterns whose label
+    is absent are skipped, and the rest search from that offset. Results are
+    identical to calling `safe_get_value` per field on the same text.
+
+    Given a `SectionIndex`, each field only searches the section named for
+    it in `field_sections`.
+
+    A match must end within `window` characters of the label it starts at,
+    so a pattern such as a lazy `.*?` under DOTALL cannot scan megabytes of
+    malformed text looking for its terminator. Values that fit in the window
+    (all of them, in real reports) are unaffected; a line running past it is
+    cut at the window's end, where `$` matches.
+    """
+
+    # Leading run of plain label text before the first regex construct
+    _LABEL_RE = re.compile(r"[A-Za-z0-9 ]+")
+
+    def __init__(self, field_maps, field_sections=None, flags=FIELD_FLAGS, window=FIELD_WINDOW_CHARS):
+        self.field_maps = field_maps
+        self.field_sections = field_sections or {}
+        self.flags = flags
+        self.window = window
+        self._patterns = {}   # pattern source -> compiled pattern
+        self._labels = {}     # pattern source -> (label as written, lowercased label)
+        self._label_res = {}  # pattern source -> case-insensitive label regex, for non-ASCII text
+        for field_map in field_maps.values():
+            for pattern in field_map.values():
+                if pattern not in self._patterns:
+                    literal = self._label_for(pattern)
+                    self._patterns[pattern] = re.compile(pattern, flags)
+                    self._labels[pattern] = (literal, literal.lower())
+                    self._label_res[pattern] = re.compile(re.escape(literal), re.IGNORECASE)
+
+    def _label_for(self, pattern):
+        label = self._LABEL_RE.match(pattern)
+        text = label.group() if label else ""
+        # A quantifier applies to the last character, which is then optional
+        if pattern[len(text):len(text) + 1] in ("*", "?", "+", "{"):
+            text = text[:-1]
+        if not text.strip():
+            raise ValueError(f"Field pattern must start with a literal label: {pattern}")
+        return text.strip()
+
+    def _label_offset(self, text, pattern, start, end, folded):
+        """
+        Offset of the first case-insensitive occurrence of the pattern's label
+        in text[start:end], or -1. `folded` caches the lowercased text. The
+        text must be ASCII.
+        """
+        literal, label = self._labels[pattern]
+        # Reports normally use the label exactly as written, so only the
+        # text before that hit needs case folding to rule out an earlier one
+        offset = text.find(literal, start, end)
+        if offset != -1:
+            earlier = text[start:offset].lower().find(label)
+            return start + earlier if earlier != -1 else offset
+        if not folded:
+            folded.append(text.lower())
+        return folded[0].find(label, start, end)
+
+    def _label_offsets(self, text, pattern, start, end, folded):
+        """Offsets of every case-insensitive occurrence of the pattern's label in text[start:end]."""
+        if not text.isascii():
+            # Case folding non-ASCII text can shift offsets; match the label as a regex
+            for match in self._label_res[pattern].finditer(text, start, end):
+                yield match.start()
+            return
+        label = self._labels[pattern][1]
+        offset = self._label_offset(text, pattern, start, end, folded)
+        while offset != -1:
+            yield offset
+            if not folded:
+                folded.append(text.lower())
+            offset = folded[0].find(label, offset + 1, end)
+
+    def search(self, text, pattern, start=0, end=None, folded=None, deadline=None):
+        """
+        Equivalent of `re.search(pattern, text[start:end], flags)`, with match
+        offsets relative to the whole text, for matches no longer than the
+        window. Raises TimeBudgetExceeded once `deadline` has passed.
+        """
+        end = len(text) if end is None else end
+        compiled = self._patterns[pattern]
+        for offset in self._label_offsets(text, pattern, start, end, [] if folded is None else folded):
+            check_deadline(deadline)
+            match = compiled.match(text, offset, min(end, offset + self.window))
+            if match:
+                return match
+        return None
+
+    def extract(self, text, sections=None, group=1, default="-", timings=None, deadline=None):
+        """
+        Returns {map_name: {field: value}} for every field map, with the same
+        values `safe_get_value` would produce for each pattern on the text (or
+        on the field's section, when `sections` is given).
+
+        If given, `timings` accumulates [seconds, searches] per "map.field".
+        Raises TimeBudgetExceeded once `deadline` has passed.
+        """
+        folded = []
+        values = {}
+        result = {}
+        for name, field_map in self.field_maps.items():
+            section_map = self.field_sections.get(name, {})
+            result[name] = {}
+            for key, pattern in field_map.items():
+                span = sections.span(section_map.get(key)) if sections else None
+                start, end = span or (0, len(text))
+                if (pattern, start, end) not in values:
+                    started = time.perf_counter() if timings is not None else 0
+                    values[(pattern, start, end)] = self.get_value(
+                        text, pattern, start, end, group, default, folded, deadline
+                    )
+                    if timings is not None:
+                        timing = timings.setdefault(f"{name}.{key}", [0.0, 0])
+                        timing[0] += time.perf_counter() - started
+                        timing[1] += 1
+                result[name][key] = values[(pattern, start, end)]
+        return result
+
+    def get_value(self, text, pattern, start=0, end=None, group=1, default="-", folded=None, deadline=None):
+        """`safe_get_value` for one registered pattern on text[start:end]."""
+        match = self.search(text, pattern, start, end, folded, deadline)
+        if match and group <= len(match.groups()):
+            found = match.group(group)
+            return found.strip().replace('\n', ' ') if found else default
+        return default
+
+# Compiled once at import and shared by every request
+field_extractor = FieldExtractor({
+    "asset": asset_field_map,
+    "security": security_field_map,
+    "report": report_field_map,
+}, field_sections)
+
+_BORROWER_ROW_RE = re.compile(r"^\s*\d+\s+.*?Company\s+(.*?)\s+NA\s+(Yes|No)", re.MULTILINE | re.IGNORECASE)
+_BORROWER_SECTION_RE = re.compile(r"Borrower\(s\) Details(.*?)Holder Details", re.DOTALL | re.IGNORECASE)
+# Longest borrower row, and borrower section when no SectionIndex is given
+BORROWER_ROW_WINDOW = 1000
+BORROWER_SECTION_WINDOW = 100 * FIELD_WINDOW_CHARS
+
+def _iter_borrower_rows(text, deadline=None):
+    """`_BORROWER_ROW_RE.finditer(text)`, with each row matched within BORROWER_ROW_WINDOW of its line start."""
+    position = 0
+    while position < len(text):
+        check_deadline(deadline)
+        match = _BORROWER_ROW_RE.match(text, position, position + BORROWER_ROW_WINDOW)
+        if match:
+            yield match
+        # Rows start at a line start, so matching resumes at the next one
+        position = text.find("\n", match.end() if match else position) + 1
+        if position == 0:
+            break
+
+def parse_borrower_details(text_blob, sections=None, deadline=None):
+    """
+    Borrowers listed in the text of a "Borrower(s) Details" section, as
+    {"name", "address", "is_owner"} dicts (see borrower_tables.py). Text
+    rows carry no address; the table reader fills it in where it can.
+    """
+    span = sections.span("borrowers") if sections else None
+    if span:
+        borrower_text = text_blob[span[0]:span[1]]
+    else:
+        start = text_blob.lower().find("borrower(s) details")
+        borrower_section_match = (
+            _BORROWER_SECTION_RE.match(text_blob, start, start + BORROWER_SECTION_WINDOW) if start != -1 else None
+        )
+        if not borrower_section_match:
+            return []
+        borrower_text = borrower_section_match.group(1)
+    return [
+        {
+            "name": match.group(1).strip().replace('\n', ' '),
+            "address": "",
+            "is_owner": match.group(2).strip().lower() == 'yes',
+        }
+        for match in _iter_borrower_rows(borrower_text, deadline)
+    ]
+
+# Lowercased text whose presence means a page holds something extraction reads
+_PAGE_MARKERS = sorted(
+    {label for _, label in field_extractor._labels.values()}
+    | {heading.lower() for headings in section_headings.values() for heading in headings}
+    # Where charge holder names end
+    | {"original view", "transaction history"}
+)
+
+def page_has_fields(page_text):
+    """Whether a page's text holds a field label, section heading, value terminator or borrower row."""
+    lowered = page_text.lower()
+    return any(marker in lowered for marker in _PAGE_MARKERS) or next(_iter_borrower_rows(page_text), None) is not None
+
+# Boilerplate pages skipped by the pdfplumber and pdfminer backends (see page_cache.py)
+page_fingerprints = PageFingerprintCache(page_has_fields, EXTRACTOR_VERSION)
+atexit.register(page_fingerprints.save)
+
+def borrower_fields(borrowers):
+    """Security interest fields describing the borrowers of one security interest."""
+    if not borrowers:
+        return {"borrowers": "-", "third_party_mortgagees": "-", "borrower_details": []}
+    return {
+        "borrowers": "; ".join(
+            f"{borrower['name']} ({borrower['address']})" if borrower["address"] else borrower["name"]
+            for borrower in borrowers
+        ),
+        # No borrower owns the asset, so it was mortgaged by a third party
+        "third_party_mortgagees": "N/A" if any(borrower["is_owner"] for borrower in borrowers) else "Details to be extracted",
+        "borrower_details": borrowers,
+    }
+
+def apply_borrower_table(asset_data, borrowers):
+    """Replaces the text-parsed borrowers of an asset record with ones read from its table."""
+    if borrowers:
+        for name, value in borrower_fields(borrowers).items():
+            setattr(asset_data.security_interest, name, value)
+
+def build_asset_record(text, timings=None, deadline=None):
+    """
+    Builds one AssetRecord (asset details and security interest details) from
+    the text of a single security interest block, or of a whole report.
+    `timings` and `deadline` are passed on to `FieldExtractor.extract`.
+    """
+    sections = SectionIndex(text)
+    fields = field_extractor.extract(text, sections, timings=timings, deadline=deadline)
+    report_fields = fields["report"]
+    # Asset details
+    asset_details = AssetDetails(**fields["asset"])
+    # Buildup area (combine area and unit)
+    area_value = asset_details.buildup_area
+    area_unit = report_fields["area_unit"]
+    asset_details.buildup_area = f"{area_value} {area_unit}".strip() if area_value != '-' and area_unit != '-' else "-"
+    # Security interest details
+    security_interest = SecurityInterest(**fields["security"])
+    # Charge holder name and amount
+    charge_amount = convert_to_lakhs(security_interest.charge_amount)
+    security_interest.charge_holder_name_amount = f"{security_interest.charge_holder_name} Rs. {charge_amount}"
+    # Borrower details
+    for name, value in borrower_fields(parse_borrower_details(text, sections, deadline)).items():
+        setattr(security_interest, name, value)
+    # Is assetUnder Charge?/ Ranking of Charge logic
+    details_of_charge = report_fields["details_of_charge"]
+    if details_of_charge and details_of_charge != "-":
+        security_interest.is_asset_under_charge = f"Yes {details_of_charge.strip()}"
+    else:
+        security_interest.is_asset_under_charge = "No"
+    return AssetRecord(asset_details, security_interest)
+
+def build_header_info(text, company_details=None):
+    """
+    Header info - Use company details from frontend if provided, otherwise
+    extract from the report text.
+    """
+    search_reference_id = field_extractor.get_value(text, report_field_map["search_reference_id"])
+    return apply_company_details(search_reference_id, company_details)
+
+def apply_company_details(search_reference_id, company_details=None):
+    """Header info from the report's search reference id and the company form."""
+    if company_details:
+        return {
+            "name_of_company": company_details.get("companyName", "-"),
+            "cin_number": company_details.get("cinNumber", "-"),
+            "search_reference_id": company_details.get("searchReferenceId", search_reference_id),
+            "date_of_incorporation": company_details.get("dateOfIncorporation", "-"),
+            "udin": company_details.get("udin", "-"),  # Add UDIN field
+            "registered_office": company_details.get("registeredOffice", "-")
+        }
+    # Fallback to static values and PDF extraction if no company details provided
+    return {
+        "name_of_company": "APRN ENTERPRISES PRIVATE LIMITED",
+        "cin_number": "U21000MH1994PTC084095",
+        "search_reference_id": search_reference_id,
+        "date_of_incorporation": "28.12.1994",
+        "udin": "-",  # Add UDIN field with default value
+        "registered_office": "SUN PARADISE BUSINESS PLAZA, 7 TH FLOOR CITY SURVEY NO 1 A/456 SENAPATI BAPAT MA, RG, Mumbai City, LOWER PAREL MUMBAI, Maharashtra, India, 400013."
+    }
+
+def extract_data_from_text(full_text, company_details=None):
+    """
+    Builds the asset record and header info from already-extracted report text.
+    See `extract_data_from_pdf` for the returned shape.
+    """
+    return build_asset_record(full_text), build_header_info(full_text, company_details)
+
+def iter_page_texts(pdf_path, stats=None, backend=None, page_filter=None, page_hook=None):
+    """
+    Yields the text of each page of the PDF that has any, using the named
+    text backend (see text_backends.py) or the configured default.
+    `pdf_path` may also be a seekable binary file object, e.g. an upload.
+
+    If given, `stats` is kept updated with "pages_total" and "pages_read",
+    boilerplate pages named by `page_filter` are skipped, and `page_hook`
+    sees every page while it is open.
+    """
+    return get_text_backend(backend).iter_page_texts(pdf_path, stats, page_filter, page_hook)
+
+def _record_resolved(asset_data):
+    """Whether every asset and security interest field, and the borrowers, of a record were found."""
+    return (
+        all(getattr(asset_data.asset_details, key) != "-" for key in asset_field_map)
+        and all(getattr(asset_data.security_interest, key) != "-" for key in security_field_map)
+        and asset_data.security_interest.borrowers != "-"
+    )
+
+def extract_data_from_pdf(pdf_path, company_details=None, incremental=False, stats=None, backend=None):
+    """
+    Extracts data from CERSAI PDF files.
+
+    Args:
+        pdf_path: Path to the PDF file, or a seekable binary file object
+        company_details: Optional dict containing company information from frontend form
+                        Keys: companyName, cinNumber, searchReferenceId, dateOfIncorporation,
+                              udin, registeredOffice
+        incremental: Read the first security interest block through `iter_security_interests`
+                     and stop opening pages as soon as it is complete (the next block starts),
+                     if every field and the borrowers were found in it. Otherwise the whole
+                     report is read as without it.
+        stats: Optional dict filled with "pages_total", "pages_read" and "pages_skipped"
+        backend: Name of the PDF text backend, defaults to PDF_TEXT_BACKEND
+
+    Returns:
+        Tuple of (asset_data, header_info) where asset_data is an AssetRecord
+        (see extraction_records.py) and header_info uses company_details if provided
+    """
+    stats = {} if stats is None else stats
+    if incremental:
+        records = iter_security_interests(pdf_path, company_details, backend, stats)
+        try:
+            first = next(records, None)
+        finally:
+            records.close()
+        if first is not None and _record_resolved(first[0]):
+            stats["pages_skipped"] = stats.get("pages_total", 0) - stats.get("pages_read", 0)
+            print(f"📄 {source_name(pdf_path)}: read {stats['pages_read']} of {stats['pages_total']} page(s), skipped {stats['pages_skipped']}")
+            return first
+    # The text record describes the first borrower section
+    tables = _borrower_table_reader(pdf_path, max_tables=1) if BORROWER_TABLES else None
+    page_texts = iter_page_texts(pdf_path, stats, backend, page_hook=tables.page_hook if tables else None)
+    full_text = "".join([page_text + "\n" for page_text in page_texts])
+    stats["pages_skipped"] = stats.get("pages_total", 0) - stats.get("pages_read", 0)
+    if incremental:
+        print(f"📄 {source_name(pdf_path)}: fields missing from the first block, read all {stats['pages_read']} page(s)")
+    asset_data, header_info = extract_data_from_text(full_text, company_details)
+    if tables is not None:
+        tables.close()
+        apply_borrower_table(asset_data, tables.table(0))
+    return asset_data, header_info
+
+# A new security interest block starts at each of these headings
+_BLOCK_START_RE = re.compile(
+    "|".join(re.escape(heading) for heading in section_headings["security_interest"]),
+    re.IGNORECASE,
+)
+_BLOCK_START_OVERLAP = max(len(heading) for heading in section_headings["security_interest"])
+
+def iter_report_blocks(page_texts):
+    """
+    Splits streamed page texts into the report preamble followed by one text
+    per security interest block, yielding each block as soon as the next one
+    starts so only the current block is held in memory.
+
+    Yields ("preamble", text) once, then ("block", text) for each block. A
+    report with no block headings yields its whole text as a single block.
+    """
+    buffer = ""
+    scan_from = 0
+    preamble_done = False
+    for page_text in page_texts:
+        buffer += page_text + "\n"
+        starts = [match.start() for match in _BLOCK_START_RE.finditer(buffer, scan_from)]
+        scan_from = max(0, len(buffer) - _BLOCK_START_OVERLAP)
+        if not starts:
+            continue
+        # buffer[0] is a block heading once the preamble has been emitted
+        if not preamble_done:
+            yield "preamble", buffer[:starts[0]]
+            preamble_done = True
+        elif starts[0] > 0:
+            starts.insert(0, 0)
+        for start, end in zip(starts, starts[1:]):
+            yield "block", buffer[start:end]
+        buffer = buffer[starts[-1]:]
+        scan_from = max(1, len(buffer) - _BLOCK_START_OVERLAP)
+    if not preamble_done:
+        yield "preamble", buffer
+    yield "block", buffer
+
+def _borrower_table_reader(pdf_path, max_tables=None):
+    return BorrowerTableReader(pdf_path, section_headings["borrowers"][0], section_headings["holder"], max_tables)
+
+def _pages_within(page_texts, deadline):
+    """Passes page texts through until `deadline`, then raises TimeBudgetExceeded."""
+    try:
+        for page_text in page_texts:
+            check_deadline(deadline)
+            yield page_text
+    finally:
+        page_texts.close()
+
+def iter_security_interests(pdf_path, company_details=None, backend=None, stats=None, timings=None, deadline=None,
+                            page_filter=None):
+    """
+    Yields (asset_data, header_info) for every security interest in a CERSAI
+    report, reading the PDF a page at a time. header_info is built from the
+    report preamble and is the same object for every record of the report.
+    `stats` and `page_filter` are passed on to `iter_page_texts` and
+    `timings` to `build_asset_record`.
+
+    With BORROWER_TABLES, each record's borrowers come from its borrower
+    table where one can be read. Tables are read during the text pass (see
+    `BorrowerTableReader`), so each record is yielded as soon as its block
+    is complete.
+
+    Once `deadline` (a `time.monotonic()` value) has passed, the records
+    completed so far have been yielded and TimeBudgetExceeded is raised.
+    """
+    stats = {} if stats is None else stats
+    tables = _borrower_table_reader(pdf_path) if BORROWER_TABLES else None
+    page_texts = iter_page_texts(pdf_path, stats, backend, page_filter, tables.page_hook if tables else None)
+    if deadline is not None:
+        page_texts = _pages_within(page_texts, deadline)
+    borrower_heading = section_headings["borrowers"][0].lower()
+    header_info = None
+    # Number of the next block's first borrower heading, counted from the start of the report
+    consumed = 0
+    try:
+        for kind, text in iter_report_blocks(page_texts):
+            if kind == "preamble":
+                preamble = text
+                continue
+            if header_info is None:
+                # Reports without block headings come through as one block holding everything
+                header_info = build_header_info(preamble or text, company_details)
+                if text is not preamble:
+                    # Headings before the first block belong to no security interest
+                    consumed = preamble.lower().count(borrower_heading)
+            heading_count = text.lower().count(borrower_heading)
+            asset_data = build_asset_record(text, timings, deadline)
+            if tables is not None and heading_count:
+                apply_borrower_table(asset_data, tables.table(consumed))
+            consumed += heading_count
+            yield asset_data, header_info
+    finally:
+        # Stops the page pass (and closes the PDF) when the caller stops early
+        page_texts.close()
+        if tables is not None:
+            tables.close()
+
+def source_name(pdf_source):
+    """File name of a PDF path, upload (FileStorage) or named file object."""
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return os.path.basename(pdf_source)
+    name = getattr(pdf_source, 'filename', None) or getattr(pdf_source, 'name', None)
+    return os.path.basename(name) if isinstance(name, str) else "uploaded file"
+
+def _file_error(pdf_path, details):
+    return {
+        "error": f"Failed to process file: {source_name(pdf_path)}",
+        "details": details
+    }
+
+def _truncation_notice(pdf_path, report):
+    return {
+        "error": f"Partial results for file: {source_name(pdf_path)}",
+        "details": f"Extraction stopped at its {EXTRACTION_TIME_BUDGET:g} second time budget after "
+                   f"{report['pages']} page(s) and {len(report['assets'])} asset(s)",
+        "truncated": True,
+    }
+
+def _extract_file(pdf_path, backend=None, name=None, timed=False):
+    """
+    The PDF-derived part of one report: its search reference id, every asset
+    record, the number of pages read, and the error message if extraction
+    failed part way through. Runs in pool workers and is what the extraction
+    cache stores.
+
+    `pdf_path` is a path, a binary file object, or the PDF's bytes (how
+    uploads reach pool workers). The report also carries "parse_seconds" and,
+    when `timed`, the per-field regex "field_seconds" for /metrics; neither is
+    cached. A file that ran out of EXTRACTION_TIME_BUDGET keeps the assets
+    read until then and is marked "truncated" (and is not cached either).
+    What the file's pages showed about boilerplate is sent back as
+    "page_cache", for `iter_file_reports` to merge into `page_fingerprints`.
+    """
+    if isinstance(pdf_path, bytes):
+        pdf_path = io.BytesIO(pdf_path)
+    started = time.perf_counter()
+    deadline = time.monotonic() + EXTRACTION_TIME_BUDGET if EXTRACTION_TIME_BUDGET > 0 else None
+    report = {"search_reference_id": "-", "assets": [], "pages": 0, "error": None}
+    stats = {}
+    timings = {} if timed else None
+    page_filter = page_fingerprints.session()
+    try:
+        for asset_data, header_info in iter_security_interests(pdf_path, backend=backend, stats=stats, timings=timings,
+                                                               deadline=deadline, page_filter=page_filter):
+            report["search_reference_id"] = header_info["search_reference_id"]
+            report["assets"].append(asset_data)
+    except TimeBudgetExceeded as e:
+        print(f"⚠️  {name or source_name(pdf_path)}: {e}, returning partial results")
+        report["truncated"] = True
+    except Exception as e:
+        print(f"Error processing file {name or source_name(pdf_path)}: {e}")
+        report["error"] = str(e)
+    report["pages"] = stats.get("pages_read", 0)
+    report["parse_seconds"] = time.perf_counter() - started
+    if page_filter is not None:
+        report["page_cache"] = {
+            "observations": list(page_filter.observations.items()),
+            "checked": page_filter.checked,
+            "skipped": page_filter.skipped,
+        }
+    if timed:
+        report["field_seconds"] = timings
+    return report
+
+def _picklable_source(pdf_source):
+    """Paths go to pool workers as they are; file objects are sent as their bytes."""
+    if is_file_like(pdf_source):
+        pdf_source.seek(0)
+        data = pdf_source.read()
+        pdf_source.seek(0)
+        return data
+    return pdf_source
+
+def _init_extraction_worker():
+    """Runs once in each extraction worker process."""
+    # Workers keep their own view of boilerplate pages and never save it; the
+    # server merges what each file showed (see `iter_file_reports`) and saves that
+    page_fingerprints.session()
+    page_fingerprints.path = None
+
+def _extract_file_in_worker(pdf_source, backend, name, timed):
+    report = _extract_file(pdf_source, backend, name, timed)
+    if report.get("page_cache"):
+        page_fingerprints.update(report["page_cache"]["observations"])
+    return report
+
+# Worker processes for process_cersai_reports, shared by every request
+extraction_pool = WorkerPool(EXTRACTION_WORKERS, initializer=_init_extraction_worker)
+
+def _iter_files_in_pool(pdf_paths, backend, max_workers, timeout, timed=False):
+    """
+    Runs `_extract_file` for every path on `extraction_pool`, at most
+    `max_workers` at a time, and yields (index, report) as each file
+    finishes, in completion order.
+
+    A file still running after `timeout` seconds, or whose worker crashed,
+    is reported as failed; its worker is terminated and replaced. Closing
+    the generator early stops the files still running.
+    """
+    tasks = [(_picklable_source(pdf_path), backend, source_name(pdf_path), timed) for pdf_path in pdf_paths]
+    for index, report, error in extraction_pool.run(_extract_file_in_worker, tasks, timeout, max_workers):
+        if error is not None:
+            print(f"Error processing file {source_name(pdf_paths[index])}: {error}")
+            report = {"search_reference_id": "-", "assets": [], "error": error}
+        yield index, report
+
+def iter_file_reports(pdf_paths, backend=None, max_workers=None, timeout=None, use_cache=True):
+    """
+    Yields (index, report) for every file as soon as its report (see
+    `_extract_file`) is available: extraction cache hits first, then files
+    in the order they finish.
+
+    Files already seen (same bytes, extractor version and backend) are served
+    from the extraction cache. Several files are extracted in parallel on up
+    to `max_workers` processes (EXTRACTION_WORKERS by default), each limited
+    to `timeout` seconds (EXTRACTION_FILE_TIMEOUT). A single file, or
+    max_workers=1, is processed in this process without a pool or time limit.
+    """
+    max_workers = EXTRACTION_WORKERS if max_workers is None else max_workers
+    timeout = EXTRACTION_FILE_TIMEOUT if timeout is None else timeout
+    backend_name = backend or DEFAULT_TEXT_BACKEND
+
+    keys = [
+        extraction_cache.key_for(pdf_path, EXTRACTOR_VERSION, backend_name) if use_cache else None
+        for pdf_path in pdf_paths
+    ]
+    missing = []
+    for index, key in enumerate(keys):
+        report = extraction_cache.get(key)
+        if report is None:
+            missing.append(index)
+        else:
+            report["assets"] = [AssetRecord.from_dict(asset) for asset in report["assets"]]
+            yield index, report
+
+    timed = metrics.field_timing
+    if len(missing) > 1 and max_workers > 1:
+        extracted = (
+            (missing[position], report)
+            for position, report in _iter_files_in_pool(
+                [pdf_paths[index] for index in missing], backend, min(max_workers, len(missing)), timeout, timed=timed
+            )
+        )
+    else:
+        extracted = ((index, _extract_file(pdf_paths[index], backend, timed=timed)) for index in missing)
+    for index, report in extracted:
+        record_extraction(report, backend_name)
+        page_cache = report.pop("page_cache", None)
+        if page_cache:
+            page_fingerprints.update(page_cache["observations"], page_cache["checked"], page_cache["skipped"])
+        if report["error"] is None and not report.get("truncated"):
+            # The cache stores JSON
+            extraction_cache.put(keys[index], {
+                "search_reference_id": report["search_reference_id"],
+                "assets": [asset.to_dict() for asset in report["assets"]],
+                "pages": report["pages"],
+                "error": None,
+            })
+        yield index, report
+
+def iter_cersai_records(pdf_paths, company_details=None, backend=None, max_workers=None, timeout=None, use_cache=True,
+                        on_file_done=None):
+    """
+    Yields the consolidated output of `process_cersai_reports` piece by piece:
+    ("company_details", details) first, then ("asset", AssetRecord) for every
+    asset and ("error", details) for every file that failed or was truncated
+    (with "truncated": true), in upload order.
+    Each file's records are yielded as soon as it and every file before it
+    have finished.
+
+    If given, `on_file_done(index, report)` is called once per file, as soon
+    as its report is available.
+    """
+    reports = {}
+    next_index = 0
+    for index, report in iter_file_reports(pdf_paths, backend, max_workers, timeout, use_cache):
+        if on_file_done:
+            on_file_done(index, report)
+        reports[index] = report
+        while next_index in reports:
+            report = reports.pop(next_index)
+            if next_index == 0:
+                yield "company_details", (
+                    apply_company_details(report["search_reference_id"], company_details) if report["assets"] else {}
+                )
+            for asset in report["assets"]:
+                yield "asset", asset
+            if report["error"] is not None:
+                yield "error", _file_error(pdf_paths[next_index], report["error"])
+            elif report.get("truncated"):
+                yield "error", _truncation_notice(pdf_paths[next_index], report)
+            next_index += 1
+
+def report_summary(pdf_path, report, company_details=None):
+    """The `process_cersai_reports` output for a single file's report."""
+    assets = [asset.to_dict() for asset in report["assets"]]
+    if report["error"] is not None:
+        assets.append(_file_error(pdf_path, report["error"]))
+    elif report.get("truncated"):
+        assets.append(_truncation_notice(pdf_path, report))
+    return {
+        "company_details": apply_company_details(report["search_reference_id"], company_details) if report["assets"] else {},
+        "assets": assets,
+    }
+
+def process_cersai_reports(pdf_paths, company_details=None, backend=None, max_workers=None, timeout=None, use_cache=True,
+                           on_file_done=None):
+    """
+    Processes a list of CERSAI PDF files (paths or seekable binary file
+    objects such as uploads) and returns a consolidated dictionary, ready
+    to be sent as JSON.
+
+    Company details are applied after extraction, so a re-upload with a
+    different company form is served from the extraction cache. See
+    `iter_file_reports` for caching, parallelism and time limits, and
+    `iter_cersai_records` for `on_file_done`.
+    """
+    if not pdf_paths:
+        return {"error": "No PDF files provided."}
+
+    final_json_structure = {"company_details": {}, "assets": []}
+    for kind, value in iter_cersai_records(pdf_paths, company_details, backend, max_workers, timeout, use_cache, on_file_done):
+        if kind == "company_details":
+            final_json_structure["company_details"] = value
+        elif kind == "asset":
+            final_json_structure["assets"].append(value.to_dict())
+        else:
+            final_json_structure["assets"].append(value)
+    return final_json_structure
@@ -0,0 +1,215 @@
+import os
+import copy
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from extraction_utils import process_cersai_reports, source_name, EXTRACTION_FILE_TIMEOUT
+
+# --- Asynchronous Extraction Jobs ---
+# POST /process?async=1 hands the uploads to a job that runs on a small local
+# thread pool (multi-file jobs still fan out to the extraction process pool).
+# Job state lives in memory and, optionally, in MongoDB so status and results
+# stay available to other workers and across restarts.
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_TTL = int(os.getenv('JOB_TTL', str(24 * 3600)))
+# Finished jobs (results included) kept in memory; older ones are dropped
+# first, and are still served from MongoDB when it is attached
+JOB_MAX_FINISHED = int(os.getenv('JOB_MAX_FINISHED', '100'))
+# A queued/running job that has not been updated for this long belonged to a
+# worker that went away; it is reported as interrupted
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', str(int(EXTRACTION_FILE_TIMEOUT) + 60)))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def job_view(job, include_result=True):
+    """JSON-serialisable view of a job, optionally without its (large) result."""
+    view = {
+        "job_id": job["_id"],
+        "status": job["status"],
+        "files_total": job["files_total"],
+        "files_done": job["files_done"],
+        "files": job["files"],
+        "error": job["error"],
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat(),
+        "version": job["version"],
+    }
+    if include_result:
+        view["result"] = job["result"]
+    return view
+
+class JobStore:
+    """
+    Thread-safe job records keyed by job id. Every change bumps the job's
+    version and wakes `wait_for_update` callers (the SSE stream). With a
+    MongoDB collection attached, each change is also written through, and
+    jobs not held in this process are read from it. Finished jobs leave
+    memory after ttl_seconds, or sooner beyond the newest max_finished,
+    checked whenever a job is created, changed, read or waited on.
+    """
+
+    def __init__(self, ttl_seconds=JOB_TTL, stale_seconds=JOB_STALE_SECONDS, max_finished=JOB_MAX_FINISHED):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_finished = max_finished
+        self.collection = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def attach_mongo(self, collection):
+        """Writes jobs through to a MongoDB collection; finished jobs expire after ttl_seconds."""
+        collection.create_index("updated_at", expireAfterSeconds=self.ttl_seconds)
+        self.collection = collection
+
+    def create(self, filenames):
+        now = _now()
+        job = {
+            "_id": uuid.uuid4().hex,
+            "status": "queued",
+            "files_total": len(filenames),
+            "files_done": 0,
+            "files": [
+                {"filename": name, "status": "queued", "assets": 0, "error": None, "truncated": False}
+                for name in filenames
+            ],
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "version": 0,
+        }
+        with self._lock:
+            self._prune(now)
+            self._jobs[job["_id"]] = job
+            snapshot = copy.deepcopy(job)
+        self._write_through(snapshot)
+        return snapshot
+
+    def update(self, job_id, file_index=None, file_fields=None, **fields):
+        """Sets job fields and, with file_index, fields of one file entry."""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            if file_index is not None:
+                job["files"][file_index].update(file_fields or {})
+                job["files_done"] = sum(1 for entry in job["files"] if entry["status"] not in ACTIVE_STATUSES)
+            job["updated_at"] = _now()
+            job["version"] += 1
+            snapshot = copy.deepcopy(job)
+            self._changed.notify_all()
+            self._prune(job["updated_at"])
+        self._write_through(snapshot)
+        return snapshot
+
+    def get(self, job_id, include_result=True):
+        """The job's view, or None if it is unknown or expired."""
+        with self._lock:
+            self._prune(_now())
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return copy.deepcopy(job_view(job, include_result))
+        if self.collection is None:
+            return None
+        try:
+            job = self.collection.find_one({"_id": job_id}, None if include_result else {"result": 0})
+        except Exception as e:
+            print(f"Job lookup failed: {e}")
+            return None
+        if job is None:
+            return None
+        job.setdefault("result", None)
+        for key in ("created_at", "updated_at"):
+            # MongoDB returns naive UTC datetimes
+            job[key] = job[key].replace(tzinfo=timezone.utc)
+        if job["status"] in ACTIVE_STATUSES and (_now() - job["updated_at"]).total_seconds() > self.stale_seconds:
+            job["status"] = "failed"
+            job["error"] = "Job was interrupted by a server restart. Please upload the files again."
+        return job_view(job, include_result)
+
+    def wait_for_update(self, job_id, version, timeout):
+        """Blocks until the in-process job passes `version` or `timeout` seconds elapse."""
+        with self._lock:
+            self._prune(_now())
+            job = self._jobs.get(job_id)
+            if job is not None and job["version"] <= version:
+                self._changed.wait_for(
+                    lambda: job_id not in self._jobs or self._jobs[job_id]["version"] > version, timeout
+                )
+                return
+        if job is None:
+            # Held by another worker: nothing to wait on but the poll interval
+            threading.Event().wait(timeout)
+
+    def _prune(self, now):
+        """Drops finished jobs past ttl_seconds, then the oldest beyond max_finished (lock held)."""
+        finished = sorted(
+            (job["updated_at"], job_id) for job_id, job in self._jobs.items() if job["status"] not in ACTIVE_STATUSES
+        )
+        expired = sum(1 for updated_at, _ in finished if (now - updated_at).total_seconds() > self.ttl_seconds)
+        # Oldest first, so the expired ones and then any beyond max_finished
+        for _, job_id in finished[:max(expired, len(finished) - max(0, self.max_finished))]:
+            del self._jobs[job_id]
+
+    def _write_through(self, job):
+        if self.collection is None:
+            return
+        try:
+            self.collection.replace_one({"_id": job["_id"]}, job, upsert=True)
+        except Exception as e:
+            print(f"Job store write failed: {e}")
+
+class JobRunner:
+    """Runs extraction jobs on a bounded thread pool, recording progress per file."""
+
+    def __init__(self, store, max_workers=JOB_WORKERS):
+        self.store = store
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_sources, company_details=None, backend=None):
+        """
+        Queues extraction of `pdf_sources` (paths or file objects that stay
+        readable until the job finishes, which then closes them) and returns
+        the new job's view.
+        """
+        job = self.store.create([source_name(source) for source in pdf_sources])
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._executor.submit(self._run, job["_id"], pdf_sources, company_details, backend)
+        return job_view(job, include_result=False)
+
+    def _run(self, job_id, pdf_sources, company_details, backend):
+        self.store.update(job_id, status="running")
+
+        def on_file_done(index, report):
+            self.store.update(job_id, file_index=index, file_fields={
+                "status": "failed" if report["error"] is not None else "done",
+                "assets": len(report["assets"]),
+                "error": report["error"],
+                "truncated": bool(report.get("truncated")),
+            })
+
+        try:
+            result = process_cersai_reports(pdf_sources, company_details, backend, on_file_done=on_file_done)
+            self.store.update(job_id, status="completed", result=result)
+            print(f"✅ Job {job_id} complete")
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            self.store.update(job_id, status="failed", error=str(e))
+        finally:
+            for source in pdf_sources:
+                if hasattr(source, "close"):
+                    source.close()
+
+# Create global instances
+job_store = JobStore()
+job_runner = JobRunner(job_store)
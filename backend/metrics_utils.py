@@ -0,0 +1,210 @@
+import os
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from pymongo import monitoring
+
+# --- Metrics ---
+# Counters and histograms rendered in the Prometheus text format by /metrics.
+# Recording a value is a lock and a few list updates. Per-field regex timing,
+# the only instrumentation inside the extraction loop, stays off until the
+# endpoint is first scraped (or METRICS_FIELD_TIMING=1), so an unscraped
+# server pays nothing for it. Values are per process: each worker of a
+# multi-process server reports its own.
+
+METRICS_FIELD_TIMING = os.getenv('METRICS_FIELD_TIMING', 'auto').lower()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PAGE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """A monotonically increasing value per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+class Gauge(Counter):
+    """A value per combination of label values that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram:
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (not cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(state[0]), state[1], state[2]) for key, state in self._values.items()}
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield self.name + "_bucket", _format_labels(self.labels, key, [("le", _format_value(bound))]), cumulative
+            yield self.name + "_bucket", _format_labels(self.labels, key, [("le", "+Inf")]), count
+            yield self.name + "_sum", _format_labels(self.labels, key), total
+            yield self.name + "_count", _format_labels(self.labels, key), count
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.scraped = False
+
+    def counter(self, name, documentation, labels=()):
+        metric = Counter(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name, documentation, labels=()):
+        metric = Gauge(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, documentation, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    @property
+    def field_timing(self):
+        """Whether extraction should time each field pattern."""
+        if METRICS_FIELD_TIMING == 'auto':
+            return self.scraped
+        return METRICS_FIELD_TIMING in ('1', 'true', 'yes')
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        self.scraped = True
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# Create a global instance
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+http_request_duration_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Time to produce an HTTP response.", ("method", "route"))
+extraction_pages = metrics.histogram(
+    "cersai_extraction_pages", "Pages per extracted report.", buckets=PAGE_BUCKETS)
+extraction_parse_seconds = metrics.histogram(
+    "cersai_extraction_parse_seconds", "Time to extract one report (cache hits excluded).", ("backend",))
+extraction_field_seconds_total = metrics.counter(
+    "cersai_extraction_field_seconds_total", "Time spent matching each field pattern.", ("field",))
+extraction_field_searches_total = metrics.counter(
+    "cersai_extraction_field_searches_total", "Field pattern searches run.", ("field",))
+pages_fingerprinted_total = metrics.counter(
+    "cersai_pages_fingerprinted_total", "Pages checked against the boilerplate page cache.")
+boilerplate_pages_skipped_total = metrics.counter(
+    "cersai_boilerplate_pages_skipped_total", "Pages skipped as known boilerplate.")
+mongo_command_duration_seconds = metrics.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency.", ("command", "status"))
+export_render_seconds = metrics.histogram(
+    "export_render_seconds", "Time to render an export.", ("format",))
+export_cache_requests_total = metrics.counter(
+    "export_cache_requests_total", "Rendered-export cache lookups.", ("format", "result"))
+export_render_queue_depth = metrics.gauge(
+    "export_render_queue_depth", "Background export renders waiting for a worker.")
+export_renders_total = metrics.counter(
+    "export_renders_total", "Export renders finished.", ("format", "mode", "status"))
+export_render_waits_total = metrics.counter(
+    "export_render_waits_total", "Export requests that waited on a render already in progress.", ("format",))
+
+def record_extraction(report, backend):
+    """Records a freshly extracted report's page count, parse time, field timings and skipped pages."""
+    if "parse_seconds" not in report:
+        # Timed out or crashed in a pool worker
+        return
+    extraction_pages.observe(report["pages"])
+    extraction_parse_seconds.observe(report["parse_seconds"], backend=backend)
+    for field, (seconds, calls) in report.get("field_seconds", {}).items():
+        extraction_field_seconds_total.inc(seconds, field=field)
+        extraction_field_searches_total.inc(calls, field=field)
+    if "page_cache" in report:
+        pages_fingerprinted_total.inc(report["page_cache"]["checked"])
+        boilerplate_pages_skipped_total.inc(report["page_cache"]["skipped"])
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener recording every command's latency."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration_seconds.observe(event.duration_micros / 1e6, command=event.command_name, status="ok")
+
+    def failed(self, event):
+        mongo_command_duration_seconds.observe(event.duration_micros / 1e6, command=event.command_name, status="error")
@@ -0,0 +1,92 @@
+"""
+One-off data migrations of the MongoDB database, kept out of the server's
+startup. Each records a marker document in the `migrations` collection when
+it completes and is skipped from then on; the server only looks the markers
+up, and logs any migration still pending. Run from the backend directory
+after deploying a release that adds one:
+    python migrate.py
+    python migrate.py --list
+    python migrate.py summary_search_fields --force
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+from summary_utils import backfill_search_fields
+
+MIGRATIONS_COLLECTION = 'migrations'
+
+# name: (description, function(db) returning how many documents it changed)
+MIGRATIONS = {
+    "summary_search_fields": (
+        "Add the GET /summaries search fields and created_at to summaries stored before they existed",
+        lambda db: backfill_search_fields(db['summaries']),
+    ),
+}
+
+
+def pending_migrations(db):
+    """Names of the migrations not yet recorded as done, in order."""
+    done = {doc["_id"] for doc in db[MIGRATIONS_COLLECTION].find({"_id": {"$in": list(MIGRATIONS)}}, {"_id": 1})}
+    return [name for name in MIGRATIONS if name not in done]
+
+
+def run_migration(db, name):
+    """Runs one migration and records its marker. Returns how many documents it changed."""
+    _, migrate = MIGRATIONS[name]
+    started = time.perf_counter()
+    changed = migrate(db)
+    db[MIGRATIONS_COLLECTION].replace_one({"_id": name}, {
+        "_id": name,
+        "completed_at": datetime.now(timezone.utc),
+        "documents": changed,
+        "seconds": round(time.perf_counter() - started, 3),
+    }, upsert=True)
+    return changed
+
+
+def connect_db():
+    import pymongo
+
+    load_dotenv()
+    client = pymongo.MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/digestadoc'))
+    client.admin.command('ping')
+    return client[os.getenv('MONGODB_DB', 'digestadoc')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", metavar="NAME",
+                        help=f"migrations to run (default: every pending one); one of {', '.join(MIGRATIONS)}")
+    parser.add_argument("--force", action="store_true", help="run the named migrations even if already done")
+    parser.add_argument("--list", action="store_true", help="show each migration and whether it is pending")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in MIGRATIONS]
+    if unknown:
+        parser.error(f"unknown migration(s): {', '.join(unknown)}")
+
+    try:
+        db = connect_db()
+    except Exception as e:
+        sys.exit(f"❌ MongoDB not reachable: {e}")
+    pending = pending_migrations(db)
+    if args.list:
+        for name, (description, _) in MIGRATIONS.items():
+            print(f"{'pending' if name in pending else 'done   '}  {name}: {description}")
+        return
+    names = [name for name in args.names if args.force or name in pending] if args.names else pending
+    if not names:
+        print("✅ No pending migrations")
+        return
+    for name in names:
+        print(f"🔄 {name}: {MIGRATIONS[name][0]}")
+        changed = run_migration(db, name)
+        print(f"✅ {name}: {changed} document(s) changed")
+
+
+if __name__ == "__main__":
+    main()
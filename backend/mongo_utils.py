@@ -0,0 +1,135 @@
+import os
+import time
+import threading
+import pymongo
+
+# --- MongoDB Connection ---
+# The client is built with connect=False, so importing the app never touches
+# the network and a worker is ready whether or not MongoDB is up. pymongo
+# connects on the first operation and reconnects by itself after an outage.
+# A background probe pings the server every MONGODB_HEALTH_INTERVAL seconds
+# so /health reports the live state, requests fail fast while MongoDB is
+# known to be down, and the on-connect setup (indexes, Mongo-backed stores)
+# runs once the server is first reached.
+
+MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '100'))
+MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '2000'))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '2000'))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '20000'))
+MONGODB_HEALTH_INTERVAL = float(os.getenv('MONGODB_HEALTH_INTERVAL', '10'))
+
+class MongoConnection:
+    """
+    A lazily connecting MongoClient with a background health probe.
+    `connected` is None until the first probe, then whether the last one
+    reached the server.
+    """
+
+    def __init__(self, uri, interval=MONGODB_HEALTH_INTERVAL, **client_options):
+        self.uri = uri
+        self.interval = interval
+        self.client_options = dict({
+            "maxPoolSize": MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": MONGODB_MIN_POOL_SIZE,
+            "connectTimeoutMS": MONGODB_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "socketTimeoutMS": MONGODB_SOCKET_TIMEOUT_MS,
+        }, **client_options)
+        self.client = None
+        self.connected = None
+        self.last_error = None
+        self.last_checked = None
+        self.ping_ms = None
+        self.reconnects = 0
+        self._on_connect = []
+        self._setup_done = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._probe = None
+        try:
+            # Parses the URI and starts nothing: no sockets until the first operation
+            self.client = pymongo.MongoClient(uri, connect=False, **self.client_options)
+        except Exception as e:
+            self.connected = False
+            self.last_error = str(e)
+            print(f"❌ MongoDB client could not be created: {e}")
+
+    def on_connect(self, callback):
+        """Runs `callback()` (once) the first time the server is reached."""
+        self._on_connect.append(callback)
+        return callback
+
+    def is_available(self):
+        """False only while the client is unusable or the probe last found the server down."""
+        return self.client is not None and self.connected is not False
+
+    def check(self):
+        """Pings the server now and updates the connection state. Returns whether it answered."""
+        if self.client is None:
+            return False
+        start = time.perf_counter()
+        try:
+            self.client.admin.command('ping')
+        except Exception as e:
+            if self.connected is not False:
+                print(f"❌ MongoDB unreachable: {e}")
+            self.connected, self.last_error, self.ping_ms = False, str(e), None
+        else:
+            if self.connected is False:
+                self.reconnects += 1
+                print("✅ MongoDB reconnected")
+            elif self.connected is None:
+                print("✅ MongoDB connected successfully")
+            self.connected, self.last_error = True, None
+            self.ping_ms = round((time.perf_counter() - start) * 1000, 2)
+            self._run_setup()
+        self.last_checked = time.time()
+        self._ready.set()
+        return self.connected
+
+    def _run_setup(self):
+        with self._lock:
+            if self._setup_done:
+                return
+            self._setup_done = True
+        for callback in self._on_connect:
+            try:
+                callback()
+            except Exception as e:
+                print(f"❌ MongoDB setup step {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def start(self):
+        """Starts the background probe (a daemon thread), if not already running."""
+        if self.client is None or self.interval <= 0:
+            return
+        with self._lock:
+            if self._probe is not None:
+                return
+            self._probe = threading.Thread(target=self._run_probe, name="mongo-health", daemon=True)
+        self._probe.start()
+
+    def _run_probe(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def wait_until_checked(self, timeout=None):
+        """
+        Blocks until the first probe finished (setup included) and returns
+        whether MongoDB is connected. For scripts; requests never wait.
+        """
+        if self.client is not None and not self._ready.is_set() and self._probe is None:
+            self.check()
+        self._ready.wait(timeout)
+        return bool(self.connected)
+
+    def status(self):
+        return {
+            "connected": self.connected,
+            "last_checked": self.last_checked,
+            "last_error": self.last_error,
+            "ping_ms": self.ping_ms,
+            "reconnects": self.reconnects,
+            "pool_size": {"min": self.client_options["minPoolSize"], "max": self.client_options["maxPoolSize"]},
+        }
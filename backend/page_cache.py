@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# --- Boilerplate Page Cache ---
+# CERSAI reports repeat the same cover, legend and disclaimer pages. Each page
+# is fingerprinted by hashing its content streams (and the form XObjects they
+# draw) before its text is extracted; once a fingerprint has come up without
+# any field in PAGE_CACHE_MIN_SIGHTINGS different documents, later documents
+# skip laying that page out. Requiring several documents keeps one report's
+# data pages (a borrower table continuing without labels, say) from ever
+# being skipped. Fingerprints are kept in a size-capped LRU saved to
+# PAGE_CACHE_PATH, so they survive restarts.
+
+PAGE_CACHE_SIZE = int(os.getenv('PAGE_CACHE_SIZE', '20000'))
+PAGE_CACHE_MIN_SIGHTINGS = int(os.getenv('PAGE_CACHE_MIN_SIGHTINGS', '2'))
+PAGE_CACHE_PATH = os.getenv('PAGE_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'page_fingerprints.json'))
+PAGE_CACHE_SAVE_INTERVAL = float(os.getenv('PAGE_CACHE_SAVE_INTERVAL', '10'))
+
+def page_fingerprint(pdf_page):
+    """
+    Hex digest of a pdfminer PDFPage's decoded content streams and form
+    XObjects, or None if they cannot be read.
+    """
+    from pdfminer.pdftypes import PDFStream, resolve1
+
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        for stream in pdf_page.contents:
+            stream = resolve1(stream)
+            if isinstance(stream, PDFStream):
+                digest.update(stream.get_data())
+        xobjects = resolve1((pdf_page.resources or {}).get("XObject")) or {}
+        for name in sorted(xobjects, key=str):
+            xobject = resolve1(xobjects[name])
+            subtype = resolve1(xobject.get("Subtype")) if isinstance(xobject, PDFStream) else None
+            # Images carry no text; forms can hold the whole page
+            if getattr(subtype, "name", None) == "Form":
+                digest.update(str(name).encode())
+                digest.update(xobject.get_data())
+    except Exception:
+        return None
+    return digest.hexdigest()
+
+class PageSession:
+    """
+    The cache as seen by one document's extraction: answers which pages to
+    skip and collects what its pages turned out to be. The observations are
+    merged back with `PageFingerprintCache.update`, in the parent process
+    when the document was extracted in a pool worker.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.observations = {}  # fingerprint -> page had no fields
+        self.checked = 0
+        self.skipped = 0
+
+    def skip(self, fingerprint):
+        self.checked += 1
+        if fingerprint is None or not self.cache.is_boilerplate(fingerprint):
+            return False
+        self.skipped += 1
+        return True
+
+    def seen(self, fingerprint, page_text):
+        if fingerprint is not None:
+            fieldless = not self.cache.has_fields(page_text or "")
+            self.observations[fingerprint] = self.observations.get(fingerprint, True) and fieldless
+
+class PageFingerprintCache:
+    """
+    Fingerprints of pages seen without any field, with the number of
+    documents each was seen in. `has_fields(page_text)` decides whether a
+    page held anything extraction uses.
+    """
+
+    def __init__(self, has_fields, version, path=PAGE_CACHE_PATH, max_entries=PAGE_CACHE_SIZE,
+                 min_sightings=PAGE_CACHE_MIN_SIGHTINGS):
+        self.has_fields = has_fields
+        self.version = version
+        self.path = path
+        self.max_entries = max_entries
+        self.min_sightings = min_sightings
+        self.pages_checked = 0
+        self.pages_skipped = 0
+        self._entries = OrderedDict()  # fingerprint -> documents it was seen in without fields
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _load(self):
+        # Loaded on first use, so importing the module never touches the disk
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Page fingerprint cache {self.path} could not be read: {e}")
+            return
+        if data.get("version") != self.version:
+            # Field patterns changed, so pages may hold fields they did not before
+            return
+        for fingerprint, sightings in data.get("entries", []):
+            self._entries[fingerprint] = sightings
+        self._evict()
+
+    def session(self):
+        """A `PageSession` for one document, or None when the cache is disabled."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load()
+        return PageSession(self)
+
+    def is_boilerplate(self, fingerprint):
+        with self._lock:
+            sightings = self._entries.get(fingerprint, 0)
+            if sightings:
+                self._entries.move_to_end(fingerprint)
+        return sightings >= self.min_sightings
+
+    def update(self, observations, checked=0, skipped=0):
+        """Merges one document's page observations and counts its pages for the skip rate."""
+        with self._lock:
+            self._load()
+            self.pages_checked += checked
+            self.pages_skipped += skipped
+            for fingerprint, fieldless in dict(observations).items():
+                if fieldless:
+                    self._entries[fingerprint] = self._entries.get(fingerprint, 0) + 1
+                    self._entries.move_to_end(fingerprint)
+                else:
+                    self._entries.pop(fingerprint, None)
+                self._dirty = True
+            self._evict()
+            due = self._dirty and time.monotonic() - self._saved_at >= PAGE_CACHE_SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        """Writes the fingerprints to `path` (atomically) if they changed since the last save."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": self.version, "entries": list(self._entries.items())}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Page fingerprint cache could not be saved to {self.path}: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "fingerprints": len(self._entries),
+                "boilerplate": sum(1 for sightings in self._entries.values() if sightings >= self.min_sightings),
+                "pages_checked": self.pages_checked,
+                "pages_skipped": self.pages_skipped,
+                "skip_rate": round(self.pages_skipped / self.pages_checked, 4) if self.pages_checked else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.pages_checked = self.pages_skipped = 0
+            self._loaded = True
+            self._dirty = True
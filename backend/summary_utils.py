@@ -0,0 +1,347 @@
+import os
+import re
+import base64
+import binascii
+from datetime import datetime, timezone
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+
+# --- Summary Search ---
+# Stored summaries carry a few top-level fields copied out of the summary
+# when it is saved: the company name and CIN, the search reference id and
+# the charge holders. GET /summaries filters on those with
+# exact, case-insensitive matches, newest first. Each filter has a compound
+# index ending in (created_at, _id), so a page is read straight off an index
+# however many summaries are stored. Pages are chained with keyset cursors,
+# so page N costs the same as page 1.
+
+SUMMARY_PAGE_SIZE = 20
+SUMMARY_PAGE_MAX = 100
+
+# Query parameter -> stored field it matches
+SEARCH_FILTERS = {
+    "cin": "company_details.cin_number",
+    "company": "company_details.name_key",
+    "search_reference_id": "search_reference_id",
+    "charge_holder": "charge_holder_keys",
+}
+
+# Fields a listing may ask for with ?fields=, and the default set
+LIST_FIELDS = {
+    "pdf_id": "pdf_id",
+    "filename": "pdf.filename",
+    "company_details": "company_details",
+    "search_reference_id": "search_reference_id",
+    "charge_holders": "charge_holders",
+    "asset_count": "asset_count",
+    "created_at": "created_at",
+}
+
+_NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+SEARCH_INDEXES = [[("created_at", -1), ("_id", -1)]] + [
+    [(field, 1)] + _NEWEST_FIRST for field in SEARCH_FILTERS.values()
+]
+
+def search_key(value):
+    """Normalised form names are matched on: lowercase, single spaces."""
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+def _present(value):
+    return value not in (None, "", "-")
+
+def search_fields(summary_json):
+    """Top-level search fields of a stored summary, taken from the summary itself."""
+    summary_json = summary_json if isinstance(summary_json, dict) else {}
+    header = summary_json.get("company_details") or {}
+    assets = [asset for asset in summary_json.get("assets") or [] if isinstance(asset, dict)]
+    charge_holders = []
+    for asset in assets:
+        name = (asset.get("security_interest_details") or {}).get("charge_holder_name")
+        if _present(name) and name not in charge_holders:
+            charge_holders.append(name)
+    company = header.get("name_of_company")
+    cin = header.get("cin_number")
+    return {
+        "company_details": {
+            "name_of_company": company if _present(company) else None,
+            "name_key": search_key(company) if _present(company) else None,
+            "cin_number": cin.strip().upper() if _present(cin) else None,
+        },
+        "search_reference_id": header.get("search_reference_id") if _present(header.get("search_reference_id")) else None,
+        "charge_holders": charge_holders,
+        "charge_holder_keys": [search_key(name) for name in charge_holders],
+        "asset_count": sum(1 for asset in assets if "error" not in asset),
+    }
+
+def encode_cursor(doc):
+    """Opaque cursor pointing just past a listed summary."""
+    millis = int(doc["created_at"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+    raw = f"{millis}:{doc['_id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """(created_at, _id) of a cursor, or ValueError if it is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        millis, object_id = raw.split(":", 1)
+        return datetime.fromtimestamp(int(millis) / 1000, timezone.utc), ObjectId(object_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+def build_search_query(filters, cursor=None):
+    """Mongo filter for the given {query parameter: value} filters, after `cursor`."""
+    clauses = []
+    for param, value in filters.items():
+        if param == "cin":
+            value = value.strip().upper()
+        elif param in ("company", "charge_holder"):
+            value = search_key(value)
+        clauses.append({SEARCH_FILTERS[param]: value})
+    if cursor:
+        created_at, object_id = decode_cursor(cursor)
+        clauses.append({"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": object_id}},
+        ]})
+    return {"$and": clauses} if len(clauses) > 1 else (clauses[0] if clauses else {})
+
+def list_projection(fields=None):
+    """Projection returning only the listed fields (all of LIST_FIELDS by default)."""
+    projection = {LIST_FIELDS[field]: 1 for field in (fields or LIST_FIELDS)}
+    # Needed for the next cursor
+    projection.update({"_id": 1, "created_at": 1})
+    return projection
+
+def list_item(doc, fields=None):
+    """JSON-ready listing entry for a projected summary document."""
+    item = {}
+    for field in fields or LIST_FIELDS:
+        value = doc
+        for part in LIST_FIELDS[field].split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if field == "company_details" and value:
+            value = {"name_of_company": value.get("name_of_company"), "cin_number": value.get("cin_number")}
+        if isinstance(value, ObjectId):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.replace(tzinfo=timezone.utc).isoformat()
+        item[field] = value
+    return item
+
+def search_summaries(collection, filters, cursor=None, limit=SUMMARY_PAGE_SIZE, fields=None):
+    """One page of matching summaries, newest first, and the cursor of the next page (None on the last)."""
+    limit = max(1, min(limit, SUMMARY_PAGE_MAX))
+    docs = list(
+        collection.find(build_search_query(filters, cursor), list_projection(fields))
+        .sort(_NEWEST_FIRST)
+        .limit(limit + 1)
+    )
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return [list_item(doc, fields) for doc in docs[:limit]], next_cursor
+
+def backfill_search_fields(collection, batch_size=1000):
+    """
+    Adds the search fields (and created_at, from the ObjectId) to summaries
+    stored before they existed. Returns how many were updated.
+    """
+    from pymongo import UpdateOne
+
+    updated = 0
+    while True:
+        docs = list(collection.find({"asset_count": {"$exists": False}}, {"summary": 1, "created_at": 1}).limit(batch_size))
+        if not docs:
+            return updated
+        collection.bulk_write([
+            UpdateOne({"_id": doc["_id"]}, {"$set": {
+                **search_fields(doc.get("summary")),
+                "created_at": doc.get("created_at") or doc["_id"].generation_time,
+            }})
+            for doc in docs
+        ], ordered=False)
+        updated += len(docs)
+
+# --- Asset Chunks ---
+# Summaries with up to SUMMARY_ASSET_CHUNK_SIZE assets keep them embedded,
+# so saving one is still a single insert. Larger ones (portfolio searches,
+# which approach the 16 MB document limit) are stored without their assets,
+# which go to the summary_assets collection in chunks of that many assets
+# keyed by (pdf_id, version, chunk). A page of assets then reads only the
+# chunks it overlaps. The chunk size and summary version are recorded on each
+# summary, so changing the setting never breaks reading summaries saved
+# before, and a re-saved summary never reads the previous version's chunks.
+
+SUMMARY_ASSET_CHUNK_SIZE = int(os.getenv('SUMMARY_ASSET_CHUNK_SIZE', '200'))
+
+ASSET_CHUNK_INDEXES = [[("pdf_id", 1), ("version", 1), ("chunk", 1)]]
+
+def split_summary(doc, chunk_size=None):
+    """
+    Moves the assets of a summary document (as built for insertion) into
+    chunk documents when there are more than `chunk_size`. Returns the chunk
+    documents, to be inserted before the summary; [] when the assets stay
+    embedded.
+    """
+    chunk_size = max(1, chunk_size or SUMMARY_ASSET_CHUNK_SIZE)
+    summary_json = doc["summary"]
+    assets = summary_json.get("assets") if isinstance(summary_json, dict) else None
+    if not isinstance(assets, list) or len(assets) <= chunk_size:
+        return []
+    doc["summary"] = {key: value for key, value in summary_json.items() if key != "assets"}
+    doc["asset_layout"] = {"total": len(assets), "chunk_size": chunk_size}
+    return [
+        {"summary_id": doc["_id"], "pdf_id": doc["pdf_id"], "version": doc.get("version", 1), "chunk": chunk,
+         "assets": assets[start:start + chunk_size]}
+        for chunk, start in enumerate(range(0, len(assets), chunk_size))
+    ]
+
+def project_asset(asset, fields):
+    """Only the given dotted paths of an asset dict (e.g. "security_interest_details.charge_holder_name")."""
+    projected = {}
+    for path in fields:
+        value, parts = asset, path.split(".")
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+def load_summary(collection, asset_collection, pdf_id, offset=0, limit=None, fields=None):
+    """
+    The summary saved for `pdf_id` with assets[offset:offset + limit], each
+    reduced to `fields` when given, the total number of assets and the
+    summary's version; (None, 0, None) when there is no such summary. With
+    the defaults this is the summary exactly as it was saved. A `limit`
+    below 1 is taken as 1, so a page always moves the offset forward.
+    """
+    offset = max(0, offset)
+    limit = None if limit is None else max(1, limit)
+    doc = collection.find_one({"pdf_id": pdf_id}, {"summary": 1, "asset_layout": 1, "version": 1, "_id": 0})
+    if not doc:
+        return None, 0, None
+    summary_json = doc["summary"]
+    version = doc.get("version", 1)
+    layout = doc.get("asset_layout")
+    end = None if limit is None else offset + limit
+    if not layout:
+        assets = summary_json.get("assets") if isinstance(summary_json, dict) else None
+        if not isinstance(assets, list):
+            return summary_json, 0, version
+        total, page = len(assets), assets[offset:end]
+    else:
+        total, chunk_size = layout["total"], layout["chunk_size"]
+        end = total if end is None else min(end, total)
+        page = []
+        if offset < end:
+            projection = {"assets": 1, "_id": 0}
+            if fields:
+                projection = {f"assets.{path}": 1 for path in fields}
+                projection["_id"] = 0
+            chunks = asset_collection.find(
+                {"pdf_id": pdf_id, "version": version,
+                 "chunk": {"$gte": offset // chunk_size, "$lte": (end - 1) // chunk_size}},
+                projection,
+            ).sort("chunk", 1)
+            assets = [asset for chunk in chunks for asset in chunk.get("assets", [])]
+            first = (offset // chunk_size) * chunk_size
+            page = assets[offset - first:end - first]
+    if fields:
+        page = [project_asset(asset, fields) if isinstance(asset, dict) else asset for asset in page]
+    if isinstance(summary_json, dict):
+        summary_json = dict(summary_json, assets=page)
+    return summary_json, total, version
+
+# --- Saving Summaries ---
+# How /save_summary, /save_summaries and `bulk_ingest.py --mongo` store a
+# summary, so all of them are found by the same queries and indexes.
+
+# Summaries per insert_many in save_summaries
+SAVE_BATCH_SIZE = int(os.getenv('SAVE_BATCH_SIZE', '500'))
+
+def summary_document(pdf_filename, summary_json, company_details=None, pdf_id=None, summary_id=None,
+                     version=1, created_at=None):
+    """
+    The stored form of a summary. Both ids are allocated up front: the
+    summary document carries the pdf_id it is looked up by and embeds what
+    used to be a separate `pdfs` document, so saving it is one insert with
+    no back-reference update. Returns the document and the asset chunks to
+    insert before it (none unless the summary is large).
+    """
+    now = datetime.now(timezone.utc)
+    doc = {
+        "_id": summary_id or ObjectId(),
+        "pdf_id": pdf_id or ObjectId(),
+        "pdf": {
+            "filename": pdf_filename,
+            "company_details": company_details  # Include company details
+        },
+        "summary": summary_json,
+        # Bumped on every re-save; part of the rendered-export cache key
+        "version": version,
+        "created_at": created_at or now,
+        "updated_at": now,
+        # Copied out of the summary for GET /summaries
+        **search_fields(summary_json),
+    }
+    return doc, split_summary(doc)
+
+def insert_unordered(collection, docs):
+    """Inserts `docs` with one unordered insert_many; returns {position in docs: error message} of those that failed."""
+    if not docs:
+        return {}
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        return {write_error['index']: write_error.get('errmsg', 'Insert failed') for write_error in e.details.get('writeErrors', [])}
+    except Exception as e:
+        print(f"Error saving to MongoDB: {e}")
+        return {position: str(e) for position in range(len(docs))}
+    return {}
+
+def save_summaries(collection, asset_collection, items, batch_size=None):
+    """
+    Stores many `{filename, summary, companyDetails}` items in `collection`
+    (asset chunks in `asset_collection`) with unordered insert_many calls of
+    `batch_size` documents. Returns one result per item,
+    in input order: `{pdf_id, summary_id}` or `{error}`. An item that fails
+    validation or its insert does not stop the others.
+    """
+    batch_size = max(1, batch_size or SAVE_BATCH_SIZE)
+    results = [None] * len(items)
+    pending = []  # (input index, document, asset chunks)
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('filename') or not item.get('summary'):
+            results[index] = {'error': 'Missing filename or summary'}
+            continue
+        pending.append((index, *summary_document(item['filename'], item['summary'], item.get('companyDetails'))))
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        # Asset chunks of large summaries go first; a summary whose chunks
+        # did not all insert is not saved, and its other chunks are removed
+        owners = [index for index, _, chunks in batch for _ in chunks]
+        failed = {}  # input index -> message
+        for position, message in insert_unordered(asset_collection, [chunk for _, _, chunks in batch for chunk in chunks]).items():
+            failed.setdefault(owners[position], message)
+        if failed:
+            try:
+                asset_collection.delete_many({"summary_id": {"$in": [doc["_id"] for index, doc, _ in batch if index in failed]}})
+            except Exception as e:
+                print(f"Error removing asset chunks of unsaved summaries: {e}")
+
+        saving = [(index, doc) for index, doc, _ in batch if index not in failed]
+        errors = insert_unordered(collection, [doc for _, doc in saving])
+        for position, (index, doc) in enumerate(saving):
+            if position in errors:
+                failed[index] = errors[position]
+            else:
+                results[index] = {'pdf_id': str(doc['pdf_id']), 'summary_id': str(doc['_id'])}
+        for index, message in failed.items():
+            results[index] = {'error': message}
+    return results
@@ -0,0 +1,187 @@
+import os
+from abc import ABC, abstractmethod
+import pdfplumber
+
+# --- PDF Text Extraction Backends ---
+# Every backend yields the text of each non-empty page, one page at a time,
+# with lines separated by "\n" so the field patterns in extraction_utils.py
+# work unchanged. Select one with the PDF_TEXT_BACKEND environment variable
+# or per request; pdfplumber is the default.
+#
+# Backends that can fingerprint a page before laying it out (pdfplumber and
+# pdfminer) take a `page_filter` (a page_cache.PageSession): pages it says
+# to skip are counted as read but never laid out, and every page laid out is
+# reported back to it with its text.
+#
+# A `page_hook(page_index, page, page_text)` is called for every page while
+# it is still open, with the pdfplumber page when the backend has one (else
+# None), so borrower tables can be read from a page already laid out.
+
+DEFAULT_TEXT_BACKEND = os.getenv('PDF_TEXT_BACKEND', 'pdfplumber')
+
+def is_file_like(pdf_source):
+    """True for binary file objects, False for paths."""
+    return hasattr(pdf_source, 'read')
+
+def _rewind(pdf_source):
+    # File objects may have been read already (e.g. hashed for the extraction cache)
+    if is_file_like(pdf_source):
+        pdf_source.seek(0)
+    return pdf_source
+
+class TextBackend(ABC):
+    """Base class for page text extractors."""
+
+    name = None
+
+    @abstractmethod
+    def iter_page_texts(self, pdf_source, stats=None, page_filter=None, page_hook=None):
+        """
+        Yields the text of each page of the PDF that has any. `pdf_source` is
+        a path or a seekable binary file object, which is left open.
+
+        If given, `stats` is kept updated with "pages_total" and "pages_read",
+        and `page_hook` is called for each page before its text is yielded.
+        """
+
+def _filtered_text(pdf_page, page_filter, extract_text):
+    """`extract_text()`, or None without calling it when `page_filter` skips the (pdfminer) page."""
+    if page_filter is None:
+        return extract_text()
+    from page_cache import page_fingerprint
+
+    fingerprint = page_fingerprint(pdf_page)
+    if page_filter.skip(fingerprint):
+        return None
+    page_text = extract_text()
+    page_filter.seen(fingerprint, page_text)
+    return page_text
+
+class PdfplumberBackend(TextBackend):
+    """Full character layout through pdfplumber (the original extractor)."""
+
+    name = 'pdfplumber'
+
+    def iter_page_texts(self, pdf_source, stats=None, page_filter=None, page_hook=None):
+        # Each page's cached layout objects are released as soon as its text is
+        # extracted, so memory stays bounded by one page however long the report is.
+        stats = {} if stats is None else stats
+        with pdfplumber.open(_rewind(pdf_source)) as pdf:
+            stats["pages_total"] = len(pdf.pages)
+            stats["pages_read"] = 0
+            for page_index, page in enumerate(pdf.pages):
+                try:
+                    page_text = _filtered_text(page.page_obj, page_filter, page.extract_text)
+                    if page_hook is not None:
+                        page_hook(page_index, page, page_text)
+                finally:
+                    page.close()
+                stats["pages_read"] += 1
+                if page_text:
+                    yield page_text
+
+class PdfminerBackend(TextBackend):
+    """
+    pdfminer layout analysis without pdfplumber's per-character objects.
+    Text boxes are read in reading order without the hierarchical box
+    grouping (boxes_flow=None) and vertical text detection, which is the bulk
+    of pdfminer's layout cost and adds nothing for regex matching.
+    """
+
+    name = 'pdfminer'
+
+    def __init__(self, **laparams):
+        self.laparams = dict({"boxes_flow": None, "detect_vertical": False, "all_texts": False}, **laparams)
+
+    def iter_page_texts(self, pdf_source, stats=None, page_filter=None, page_hook=None):
+        if is_file_like(pdf_source):
+            yield from self._iter_file_page_texts(pdf_source, stats, page_filter, page_hook)
+            return
+        with open(pdf_source, 'rb') as fp:
+            yield from self._iter_file_page_texts(fp, stats, page_filter, page_hook)
+
+    def _iter_file_page_texts(self, fp, stats, page_filter, page_hook):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams, LTTextContainer
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import resolve1
+
+        stats = {} if stats is None else stats
+        # PDFPage.get_pages, with the document parsed once for both the page count and the pages
+        document = PDFDocument(PDFParser(_rewind(fp)), caching=True)
+        try:
+            # The page tree's own count, so counting needs no pass over the pages
+            stats["pages_total"] = int(resolve1(resolve1(document.catalog["Pages"])["Count"]))
+        except Exception:
+            # Malformed page tree: walk it
+            stats["pages_total"] = sum(1 for _ in PDFPage.create_pages(document))
+        stats["pages_read"] = 0
+        # pdfminer.high_level.extract_pages, with pages laid out one at a time on demand
+        resource_manager = PDFResourceManager(caching=True)
+        device = PDFPageAggregator(resource_manager, laparams=LAParams(**self.laparams))
+        interpreter = PDFPageInterpreter(resource_manager, device)
+
+        def layout_text(page):
+            interpreter.process_page(page)
+            return "".join(
+                element.get_text() for element in device.get_result() if isinstance(element, LTTextContainer)
+            ).strip("\n")
+
+        for page_index, page in enumerate(PDFPage.create_pages(document)):
+            page_text = _filtered_text(page, page_filter, lambda: layout_text(page))
+            if page_hook is not None:
+                page_hook(page_index, None, page_text)
+            stats["pages_read"] += 1
+            if page_text:
+                yield page_text
+
+class PdfiumBackend(TextBackend):
+    """
+    Text-only extraction through PDFium (pypdfium2, installed with pdfplumber).
+    No layout analysis in Python at all, so it is by far the fastest.
+    """
+
+    name = 'pdfium'
+
+    def iter_page_texts(self, pdf_source, stats=None, page_filter=None, page_hook=None):
+        # Pages are not fingerprinted: PDFium extracts text natively faster than
+        # pdfminer could parse and hash a page's content streams.
+        import pypdfium2
+
+        stats = {} if stats is None else stats
+        pdf = pypdfium2.PdfDocument(_rewind(pdf_source))
+        try:
+            stats["pages_total"] = len(pdf)
+            stats["pages_read"] = 0
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    text_page = page.get_textpage()
+                    page_text = text_page.get_text_range()
+                    text_page.close()
+                finally:
+                    page.close()
+                stats["pages_read"] += 1
+                page_text = page_text.replace('\r\n', '\n').replace('\r', '\n').strip('\n')
+                if page_hook is not None:
+                    page_hook(index, None, page_text)
+                if page_text:
+                    yield page_text
+        finally:
+            pdf.close()
+
+text_backends = {
+    backend.name: backend
+    for backend in (PdfplumberBackend(), PdfminerBackend(), PdfiumBackend())
+}
+
+def get_text_backend(name=None):
+    """Returns the named backend, or the configured default when name is None."""
+    name = name or DEFAULT_TEXT_BACKEND
+    try:
+        return text_backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF text backend '{name}'. Choose one of: {', '.join(text_backends)}")
@@ -0,0 +1,195 @@
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait as wait_ready
+
+# --- Worker Processes ---
+# PDF extraction runs on long-lived worker processes shared by every request.
+# Workers are started with forkserver (spawn where that is not available),
+# never forked from the multithreaded server, so a child cannot inherit a
+# lock another thread was holding at fork time. Each worker runs one task at
+# a time and the pool knows which, so a task past its timeout is stopped by
+# terminating just its worker, and a worker that dies fails just the task it
+# was running. Either way the worker is replaced when the next task needs it.
+
+WORKER_START_METHOD = os.getenv('WORKER_START_METHOD', 'forkserver')
+
+def _worker_main(conn, initializer=None):
+    """Runs (func, args) tasks from `conn` until it closes, sending back (result, error) for each."""
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            outcome = (func(*args), None)
+        except Exception as e:
+            outcome = (None, str(e) or type(e).__name__)
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            conn.send((None, f"Result could not be sent back: {e}"))
+
+class _Worker:
+    def __init__(self, context, initializer):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, initializer),
+                                       name="pool-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(5)
+        self.conn.close()
+
+class WorkerPool:
+    """
+    Up to `max_workers` worker processes, started on first use and kept for
+    later calls. `initializer()` runs once in every new worker.
+    """
+
+    def __init__(self, max_workers, initializer=None, start_method=WORKER_START_METHOD):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = 'spawn'
+        self.start_method = start_method
+        self.started = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self._context = None
+        self._workers = set()  # every live worker, idle or busy
+        self._idle = []
+        self._reserved = 0     # workers being started
+        self._condition = threading.Condition()
+        atexit.register(self.shutdown)
+
+    def run(self, func, args_list, timeout=None, max_workers=None):
+        """
+        Runs `func(*args)` for every tuple in `args_list` on at most
+        `max_workers` workers at a time and yields (index, result, error) as
+        each finishes, in completion order. `error` is None on success, else
+        why the task failed: the exception it raised, a timeout (it ran over
+        `timeout` seconds) or its worker dying. A call may ask for more
+        workers than the pool's max_workers; the pool grows to that size.
+        Closing the generator early stops the tasks still running.
+        """
+        limit = max(1, max_workers or self.max_workers)
+        queue = deque(enumerate(args_list))
+        running = {}  # worker -> (index, started)
+        try:
+            while queue or running:
+                while queue and len(running) < limit:
+                    worker = self._acquire(limit, block=not running)
+                    if worker is None:
+                        break
+                    index, args = queue[0]
+                    try:
+                        worker.conn.send((func, args))
+                    except (OSError, ValueError):
+                        # Died while idle: the task goes to another worker
+                        self._discard(worker)
+                        continue
+                    queue.popleft()
+                    running[worker] = (index, time.monotonic())
+                ready = wait_ready(
+                    [worker.conn for worker in running] + [worker.process.sentinel for worker in running], timeout=1.0
+                )
+                now = time.monotonic()
+                for worker, (index, started) in list(running.items()):
+                    if worker.conn in ready:
+                        try:
+                            result, error = worker.conn.recv()
+                        except (EOFError, OSError):
+                            pass
+                        else:
+                            del running[worker]
+                            self._release(worker)
+                            yield index, result, error
+                            continue
+                    if not worker.process.is_alive():
+                        del running[worker]
+                        self._discard(worker)
+                        with self._condition:
+                            self.crashes += 1
+                        yield index, None, f"Worker process crashed (exit code {worker.process.exitcode})"
+                    elif timeout and now - started > timeout:
+                        del running[worker]
+                        self._discard(worker)
+                        with self._condition:
+                            self.timeouts += 1
+                        yield index, None, f"Timed out after {timeout:g} seconds"
+        finally:
+            # Abandoned tasks: their workers cannot be reused until they finish
+            for worker in running:
+                self._discard(worker)
+
+    def _acquire(self, limit, block):
+        """An idle worker, or a new one while fewer than `limit` exist; None when none is free and not `block`."""
+        with self._condition:
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.process.is_alive():
+                        return worker
+                    self._workers.discard(worker)
+                    worker.stop()
+                if len(self._workers) + self._reserved < max(limit, self.max_workers):
+                    self._reserved += 1
+                    break
+                if not block:
+                    return None
+                self._condition.wait()
+            if self._context is None:
+                self._context = multiprocessing.get_context(self.start_method)
+        try:
+            worker = _Worker(self._context, self.initializer)
+        except BaseException:
+            with self._condition:
+                self._reserved -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._reserved -= 1
+            self._workers.add(worker)
+            self.started += 1
+        return worker
+
+    def _release(self, worker):
+        with self._condition:
+            self._idle.append(worker)
+            self._condition.notify()
+
+    def _discard(self, worker):
+        worker.stop()
+        with self._condition:
+            self._workers.discard(worker)
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "start_method": self.start_method,
+                "max_workers": self.max_workers,
+                "workers": len(self._workers),
+                "idle": len(self._idle),
+                "started": self.started,
+                "timeouts": self.timeouts,
+                "crashes": self.crashes,
+            }
+
+    def shutdown(self):
+        """Stops every worker."""
+        with self._condition:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.stop()
@@ -6,11 +6,10 @@ import { useNavigate } from 'react-router-dom';
 import { CompanyDetails } from './CompanyDetailsForm';
 
 interface FileUploadProps {
-  onProcessingComplete?: (pdfId: string) => void;
   companyDetails?: CompanyDetails;
 }
 
-const FileUpload: React.FC<FileUploadProps> = ({ onProcessingComplete, companyDetails }) => {
+const FileUpload: React.FC<FileUploadProps> = ({ companyDetails }) => {
   const [files, setFiles] = useState<File[]>([]);
   const [isProcessing, setIsProcessing] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
@@ -50,7 +49,7 @@ const FileUpload: React.FC<FileUploadProps> = ({ onProcessingComplete, companyDe
     setUploadProgress(0);
 
     try {
-      // Step 1: Upload and process PDFs with company details
+      // Upload PDFs with company details
       const formData = new FormData();
       files.forEach(file => {
         formData.append('files[]', file);
@@ -61,7 +60,8 @@ const FileUpload: React.FC<FileUploadProps> = ({ onProcessingComplete, companyDe
         formData.append('companyDetails', JSON.stringify(companyDetails));
       }
 
-      const processResponse = await fetch('http://localhost:5000/process', {
+      // Queue a background job; the processing page follows its progress
+      const processResponse = await fetch('http://localhost:5000/process?async=1', {
         method: 'POST',
         body: formData,
       });
@@ -70,40 +70,17 @@ const FileUpload: React.FC<FileUploadProps> = ({ onProcessingComplete, companyDe
         throw new Error(`Processing failed: ${processResponse.statusText}`);
       }
 
-      const processResult = await processResponse.json();
-      setUploadProgress(50);
-
-      // Step 2: Save to MongoDB - send all filenames and company details
-      const savePayload = {
-        filename: files.map(f => f.name).join(', '), // Send all filenames
-        summary: processResult,
-        companyDetails: companyDetails // Include company details
-      };
+      const job = await processResponse.json();
+      setUploadProgress(100);
 
-      const saveResponse = await fetch('http://localhost:5000/save_summary', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
+      navigate('/processing', {
+        state: {
+          jobId: job.job_id,
+          filename: files.map(f => f.name).join(', '), // Send all filenames
+          companyDetails: companyDetails,
         },
-        body: JSON.stringify(savePayload),
       });
 
-      if (!saveResponse.ok) {
-        throw new Error(`Saving failed: ${saveResponse.statusText}`);
-      }
-
-      const saveResult = await saveResponse.json();
-      setUploadProgress(100);
-
-      console.log('Processing complete:', saveResult);
-      
-      // Navigate to result page with PDF ID
-      if (onProcessingComplete) {
-        onProcessingComplete(saveResult.pdf_id);
-      } else {
-        navigate('/result', { state: { pdfId: saveResult.pdf_id } });
-      }
-
     } catch (error) {
       console.error('Error processing files:', error);
       alert('Error processing files. Please try again.');
@@ -175,7 +152,7 @@ const FileUpload: React.FC<FileUploadProps> = ({ onProcessingComplete, companyDe
       {isProcessing && (
         <div className="space-y-2">
           <div className="flex justify-between text-sm">
-            <span>Processing files...</span>
+            <span>Uploading files...</span>
             <span>{uploadProgress}%</span>
           </div>
           <div className="w-full bg-muted rounded-full h-2">
@@ -1,31 +1,103 @@
 import { useEffect, useState } from 'react';
 import { FileText, Brain, CheckCircle } from 'lucide-react';
-import { useNavigate } from 'react-router-dom';
+import { useLocation, useNavigate } from 'react-router-dom';
+
+const API_BASE = 'http://localhost:5000';
+
+interface JobFile {
+  filename: string;
+  status: 'queued' | 'done' | 'failed';
+  assets: number;
+  error: string | null;
+}
+
+interface JobProgress {
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  files_total: number;
+  files_done: number;
+  files: JobFile[];
+  error: string | null;
+}
 
 export const ProcessingAnimation = () => {
   const [currentStep, setCurrentStep] = useState(0);
+  const [progress, setProgress] = useState<JobProgress | null>(null);
   const navigate = useNavigate();
+  const location = useLocation();
+  const { jobId, filename, companyDetails } = location.state || {};
 
   const steps = [
-    { icon: FileText, text: 'Reading PDF content...', duration: 2000 },
-    { icon: Brain, text: 'Analyzing document structure...', duration: 2500 },
-    { icon: CheckCircle, text: 'Generating summary...', duration: 2000 },
+    { icon: FileText, text: 'Waiting for a worker...' },
+    { icon: Brain, text: 'Extracting security interests...' },
+    { icon: CheckCircle, text: 'Saving summary...' },
   ];
 
   useEffect(() => {
-    const timer = setTimeout(() => {
-      if (currentStep < steps.length - 1) {
-        setCurrentStep(currentStep + 1);
-      } else {
-        // Navigate to results after all steps
-        setTimeout(() => {
-          navigate('/result');
-        }, 1500);
+    if (!jobId) {
+      navigate('/');
+      return;
+    }
+
+    let finished = false;
+
+    // Fetch the finished job's result and save it, as the upload page used to
+    const saveResult = async () => {
+      try {
+        setCurrentStep(2);
+        const jobResponse = await fetch(`${API_BASE}/jobs/${jobId}`);
+        if (!jobResponse.ok) {
+          throw new Error(`Fetching result failed: ${jobResponse.statusText}`);
+        }
+        const job = await jobResponse.json();
+
+        const saveResponse = await fetch(`${API_BASE}/save_summary`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ filename, summary: job.result, companyDetails }),
+        });
+        if (!saveResponse.ok) {
+          throw new Error(`Saving failed: ${saveResponse.statusText}`);
+        }
+        const saveResult = await saveResponse.json();
+        navigate('/result', { state: { pdfId: saveResult.pdf_id } });
+      } catch (error) {
+        console.error('Error processing files:', error);
+        alert('Error processing files. Please try again.');
+        navigate('/');
+      }
+    };
+
+    const events = new EventSource(`${API_BASE}/jobs/${jobId}/events`);
+    const onUpdate = (event: MessageEvent) => {
+      const job: JobProgress = JSON.parse(event.data);
+      setProgress(job);
+      if (job.status === 'running') {
+        setCurrentStep(1);
+      } else if (job.status === 'completed' && !finished) {
+        finished = true;
+        events.close();
+        saveResult();
+      } else if (job.status === 'failed' && !finished) {
+        finished = true;
+        events.close();
+        console.error('Processing job failed:', job.error);
+        alert('Error processing files. Please try again.');
+        navigate('/');
       }
-    }, steps[currentStep].duration);
+    };
+    ['queued', 'running', 'completed', 'failed'].forEach(status => events.addEventListener(status, onUpdate));
 
-    return () => clearTimeout(timer);
-  }, [currentStep, navigate, steps]);
+    return () => {
+      finished = true;
+      events.close();
+    };
+  }, [jobId, filename, companyDetails, navigate]);
+
+  const percent = progress && progress.files_total
+    ? Math.round((progress.files_done / progress.files_total) * 100)
+    : 0;
 
   return (
     <div className="min-h-screen flex items-center justify-center p-6">
@@ -43,7 +115,7 @@ export const ProcessingAnimation = () => {
             {/* Outer spinning ring */}
             <div className="absolute inset-0 border-4 border-primary/20 rounded-full processing-spin" />
             <div className="absolute inset-2 border-4 border-t-primary border-transparent rounded-full processing-spin" style={{ animationDirection: 'reverse' }} />
-            
+
             {/* Center icon */}
             <div className="absolute inset-0 flex items-center justify-center">
               <div className="w-12 h-12 bg-primary/10 rounded-full flex items-center justify-center processing-pulse">
@@ -59,21 +131,37 @@ export const ProcessingAnimation = () => {
         {/* Step text */}
         <div className="space-y-4">
           <h2 className="text-2xl font-bold text-foreground">
-            Processing your PDF
+            Processing your PDF{progress && progress.files_total > 1 ? 's' : ''}
           </h2>
           <p className="text-lg text-primary font-medium animate-fade-in" key={currentStep}>
             {steps[currentStep].text}
           </p>
         </div>
 
+        {/* Per-file progress */}
+        {progress && (
+          <div className="space-y-2 mt-8">
+            <div className="flex justify-between text-sm">
+              <span>{progress.files_done} of {progress.files_total} file{progress.files_total > 1 ? 's' : ''} done</span>
+              <span>{percent}%</span>
+            </div>
+            <div className="w-full bg-muted rounded-full h-2">
+              <div
+                className="bg-primary h-2 rounded-full transition-all duration-300"
+                style={{ width: `${percent}%` }}
+              />
+            </div>
+          </div>
+        )}
+
         {/* Progress indicators */}
         <div className="flex justify-center space-x-2 mt-8">
           {steps.map((_, index) => (
             <div
               key={index}
               className={`w-3 h-3 rounded-full transition-all duration-500 ${
-                index <= currentStep 
-                  ? 'bg-primary scale-110' 
+                index <= currentStep
+                  ? 'bg-primary scale-110'
                   : 'bg-muted'
               }`}
             />
@@ -91,4 +179,4 @@ export const ProcessingAnimation = () => {
       </div>
     </div>
   );
-};
\ No newline at end of file
+};